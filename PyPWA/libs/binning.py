@@ -16,20 +16,25 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import functools
+import hashlib
+import inspect
+import itertools
 import json
 import warnings
 from collections import OrderedDict
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
 
 import numpy as npy
 import tables
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.libs import process
 from PyPWA.libs.file import slot_table
 from PyPWA.libs.file.processor import DataProcessor
-from PyPWA.libs.math import reaction
+from PyPWA.libs.math import reaction, vectors
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
@@ -40,6 +45,8 @@ __version__ = VERSION
 """
 
 _EVENT_CHUNK = 250000
+_BIN_TYPES = [(name, "f8") for name in ["mass", "beam", "t", "tp"]]
+_REBUILD = "bin_data_rebuild"  # Holds bin_data until it's filled
 
 
 class BinType(Enum):
@@ -49,137 +56,350 @@ class BinType(Enum):
     BEAM = "beam"
 
 
-def make_bin_table(slot: slot_table.DataSlot):
-    bin_types = [(name, "f8") for name in ["mass", "beam", "t", "tp"]]
-    bin_array = npy.zeros(len(slot), bin_types)
-    root = slot.get_root()
+def _get_column(variable: Union[BinType, str]) -> str:
+    """Name of the bin data column a variable is stored in"""
+    return variable.value if isinstance(variable, BinType) else variable
 
-    # lower limit (ll), upper limit (ul)
-    for ll in range(0, len(slot), _EVENT_CHUNK):
-        ul = ll + _EVENT_CHUNK
-        root_chunk = root.read(ll, ul)
 
-        bin_array["mass"][ll:ul] = reaction.get_event_mass(root_chunk)
-        bin_array["tp"][ll:ul] = reaction.get_t_prime(root_chunk)
-        bin_array["t"][ll:ul] = reaction.get_t(root_chunk)
-        bin_array["beam"][ll:ul] = root_chunk.get_particles_by_id(1)[0].z
+def make_bin_table(slot: slot_table.DataSlot, processes: int = 1):
+    """Calculates the binning variables of every event into bin_data
 
-    slot.add_data("bin_data", bin_array)
-    slot.flush()
+    :param processes: Processes to calculate the chunks with, the chunks
+        are still read and written by this process.
+    """
+    root = slot.get_root()
 
+    def fill(bin_table: tables.Table):
+        if processes > 1 and len(slot) > _EVENT_CHUNK:
+            interface = _BinInterface(root, bin_table, _EVENT_CHUNK)
+            manager = process.make_processes(
+                dict(), _BinKernel(), interface, processes
+            )
+            try:
+                manager.run()
+            finally:
+                manager.stop()
+        else:
+            for start in range(0, len(slot), _EVENT_CHUNK):
+                chunk = root.read(start, start + _EVENT_CHUNK)
+                bin_table.append(_get_bin_variables(chunk))
 
-def bin_by_width(bins: npy.ndarray,
-                 queue: OrderedDict,
-                 position: int) -> Dict[str, npy.ndarray]:
-    # Unpack queue
-    upper = queue[position]["upper"]
-    lower = queue[position]["lower"]
-    count = queue[position]["count"]
-    variable = queue[position]["variable"]
+    _replace_bin_table(slot, _BIN_TYPES, fill)
 
-    # Size of each step in the standard data
-    step_size = (upper - lower) / count
-    truth_table = dict()
 
-    # Handle events outside of the range
-    truth_table["lower"] = bins[variable.value] < lower
-    truth_table["upper"] = bins[variable.value] > upper
+def _replace_bin_table(
+        slot: slot_table.DataSlot, dtype: List[Tuple[str, str]],
+        fill: Callable[[tables.Table], None]) -> tables.Table:
+    """Fills a new table, then replaces bin_data with it
 
-    step_with_count = enumerate(npy.arange(lower, upper, step_size))
-    for index, lower_limit in step_with_count:
-        x = bins[variable.value] > lower_limit
-        y = bins[variable.value] < lower_limit + step_size
-        truth_table[str(index)] = npy.logical_and(x, y)
+    The table is only renamed to bin_data once it's filled, so a failed
+    or interrupted fill never leaves a partial bin_data behind.
+    """
+    if _REBUILD in slot.extra_data:
+        slot.remove_data(_REBUILD)
+
+    table = slot.add_table(_REBUILD, dtype)
+    try:
+        fill(table)
+        if len(table) != len(slot):
+            raise RuntimeError("Bin data doesn't match the slot's length!")
+    except BaseException:
+        slot.remove_data(_REBUILD)
+        raise
+
+    if "bin_data" in slot.extra_data:
+        slot.remove_data("bin_data")
+    table._f_rename("bin_data")
+    slot.flush()
+    return table
+
+
+def _get_bin_variables(root_chunk: vectors.ParticlePool) -> npy.ndarray:
+    # The event mass, s, and t are only calculated once and shared with t'
+    bin_array = npy.empty(root_chunk.event_count, _BIN_TYPES)
+    bin_array["mass"] = reaction.get_event_mass(root_chunk)
+    bin_array["t"] = reaction.get_t(root_chunk)
+    bin_array["tp"] = reaction.get_t_prime(
+        root_chunk, bin_array["mass"], reaction.get_s(root_chunk),
+        bin_array["t"]
+    )
+    bin_array["beam"] = root_chunk.get_particles_by_id(1)[0].z
+    return bin_array
+
+
+def add_bin_variable(
+        slot: slot_table.DataSlot, name: str,
+        function: Callable[[Any], npy.ndarray]):
+    """Adds a column calculated by a user's function to bin_data
+
+    The function is handed a chunk of the slot's root and returns the
+    variable for each of its events. The column is cached with the hash
+    of the function's source, so it's only calculated again when the
+    function changes. The table is rebuilt a chunk at a time to add the
+    column, since columns can't be added to a PyTables table.
+    """
+    if name in [column for column, _ in _BIN_TYPES]:
+        raise ValueError(f"{name} is already a binning variable!")
+
+    old_table = slot.get_data("bin_data")
+    variables = dict(getattr(old_table.attrs, "variables", dict()))
+    source_hash = _get_source_hash(function)
+    if variables.get(name) == source_hash:
+        return
+
+    dtype = [
+        (column, old_table.coldtypes[column])
+        for column in old_table.colnames if column != name
+    ] + [(name, "f8")]
+    root = slot.get_root()
 
-    return truth_table
+    def fill(new_table: tables.Table):
+        for start in range(0, len(slot), _EVENT_CHUNK):
+            old_chunk = old_table.read(start, start + _EVENT_CHUNK)
+            chunk = npy.empty(len(old_chunk), dtype)
+            for column, _ in dtype[:-1]:
+                chunk[column] = old_chunk[column]
+            chunk[name] = function(root.read(start, start + _EVENT_CHUNK))
+            new_table.append(chunk)
+
+    new_table = _replace_bin_table(slot, dtype, fill)
+    variables[name] = source_hash
+    new_table.attrs.variables = variables
+    slot.flush()
 
 
-class _BinFixed:
+def _get_source_hash(function: Callable[[Any], npy.ndarray]) -> str:
+    return hashlib.sha256(_get_source(function)).hexdigest()
 
-    """
-    .. Todo::
-        This currently just splits the variable by length. This needs
-        to be changed so that variables are ordered before they are
-        binned.
-    """
 
-    def __init__(self, bins: npy.ndarray, queue: OrderedDict):
-        self.__bins = bins
-        self.__queue = queue
-        self.__truth_table: npy.ndarray = None
+def _get_source(function: Callable[[Any], npy.ndarray]) -> bytes:
+    # Partials are their function's source with their arguments
+    if isinstance(function, functools.partial):
+        arguments = repr((function.args, sorted(function.keywords.items())))
+        return _get_source(function.func) + arguments.encode()
 
-        self.__reset()
+    # Functions without source, like those made in a shell, fall back to
+    # their compiled code, which doesn't change with comments.
+    try:
+        return inspect.getsource(function).encode()
+    except (OSError, TypeError):
+        pass
+    try:
+        return function.__code__.co_code
+    except AttributeError:
+        # Compiled callables like NumPy's ufuncs only have their repr
+        return repr(function).encode()
 
-    def __reset(self):
-        self.__index = 0
-        self.__list = []
 
-    def get_fixed(
-            self, position: int, truth_table: npy.ndarray = True
-    ) -> List[npy.ndarray]:
-        self.__reset()
-        self.__truth_table = truth_table
+class _BinKernel(process.Kernel):
 
-        variable, fixed_size = self.__get_fixed_vars(position)
-        lower, center, upper = self.__get_binning_information(fixed_size)
+    def setup(self):
+        pass
 
-        self.__get_edge_events(lower)
-        self.__get_center_events(upper, fixed_size)
-        self.__get_edge_events(upper)
-        return self.__list
+    def process(self, data: Any = False) -> npy.ndarray:
+        return _get_bin_variables(data)
 
-    def __get_fixed_vars(self, position):
-        val = self.__queue[position]
-        return val["variable"], val["count"]
 
-    def __get_binning_information(self, fixed_size):
-        total = self.__truth_table.sum()
-        num_in_center = total // fixed_size
-        lower_extra = (total % fixed_size) // 2
+class _BinInterface(process.Interface):
 
-        if (lower_extra * 2 + num_in_center * fixed_size) == total:
-            upper_extra = lower_extra
-        else:
-            upper_extra = lower_extra + 1
+    """Hands the chunks out to the processes and writes them in order
 
-        return lower_extra, num_in_center, upper_extra
+    The HDF5 file stays with this process, since it's open for writing
+    and can't safely be opened again in the forked processes. Each
+    process is handed its next chunk as soon as its last chunk has been
+    appended, so only one chunk per process is held at a time.
+    """
 
-    def __get_edge_events(self, limit):
-        self.__list.append(self.__loop_until_limit(limit))
+    def __init__(
+            self, root: slot_table.ParticleLeaf, bin_table: tables.Table,
+            chunk_size: int):
+        self.__root = root
+        self.__bin_table = bin_table
+        self.__chunk_size = chunk_size
 
-    def __get_center_events(self, center, fixed_size):
-        for i in range(center):
-            self.__list.append(self.__loop_until_limit(fixed_size))
+    def run(self, communicator: List[Any], args: Any):
+        starts = list(range(0, len(self.__root), self.__chunk_size))
+        for index, start in enumerate(starts[:len(communicator)]):
+            self.__send(communicator[index], start)
 
-    def __loop_until_limit(self, limit):
-        count = 0
-        while True:
-            array = npy.zeros(len(self.__truth_table), bool)
+        for index, start in enumerate(starts):
+            connection = communicator[index % len(communicator)]
+            received = connection.recv()
+            if isinstance(received, process.ProcessCodes):
+                raise RuntimeError("Failed to calculate the bin variables!")
+            self.__bin_table.append(received)
 
-            if self.__truth_table[self.__index]:
-                count = count + 1
-                array[self.__index] = True
+            if index + len(communicator) < len(starts):
+                self.__send(connection, starts[index + len(communicator)])
 
-            self.__index = self.__index + 1
+    def __send(self, connection: Any, start: int):
+        # Sending pickles the chunk, so the read buffer can be reused
+        connection.send(self.__root.read(start, start + self.__chunk_size))
 
-            if count == limit:
-                return array
+
+def get_bin_edges(
+        bins: npy.ndarray, queue: OrderedDict) -> List[npy.ndarray]:
+    """Finds the edges of every queued binning
+
+    Width binnings have count + 1 edges. Fixed binnings have count - 1
+    edges for each bin queued before them, picked so each bin is split
+    evenly, which needs the binned variables of every event.
+    """
+    edges = []
+    for position in queue.keys():
+        if queue[position]["type"] == "width":
+            edges.append(npy.linspace(
+                queue[position]["lower"], queue[position]["upper"],
+                queue[position]["count"] + 1
+            ))
+        else:
+            # Every event's bin so far is needed to split the bins evenly
+            before = OrderedDict(list(queue.items())[:len(edges)])
+            flat, shape = get_bin_index(bins, before, edges)
+            edges.append(_get_fixed_edges(
+                flat, int(npy.prod(shape)),
+                bins[_get_column(queue[position]["variable"])],
+                queue[position]["count"]
+            ))
+    return edges
+
+
+def get_bin_index(
+        bins: npy.ndarray, queue: OrderedDict,
+        edges: List[npy.ndarray] = None) -> Tuple[npy.ndarray, List[int]]:
+    """Finds the bin of every event for all the queued binnings at once
+
+    Width binnings number their bins from 1 to count, with 0 for events
+    below the range and count + 1 for events at or above it. Fixed
+    binnings number their bins from 0 to count - 1. The numbers from each
+    binning are combined into a single flat index per event.
+
+    :param edges: Edges from get_bin_edges, so bins can be found a chunk
+        of events at a time. Found from the bins if not set.
+    :return: The flat index of every event, and the number of bins in
+        each binning.
+    """
+    if edges is None:
+        edges = get_bin_edges(bins, queue)
+
+    flat = npy.zeros(len(bins), npy.intp)
+    shape = []
+    for position, position_edges in zip(queue.keys(), edges):
+        values = bins[_get_column(queue[position]["variable"])]
+        if queue[position]["type"] == "width":
+            local = npy.searchsorted(position_edges, values, "right")
+            shape.append(len(position_edges) + 1)
+        else:
+            local = _get_fixed_index(flat, values, position_edges)
+            shape.append(position_edges.shape[1] + 1)
+
+        flat *= shape[-1]
+        flat += local
+    return flat, shape
+
+
+def _get_fixed_index(
+        flat: npy.ndarray, values: npy.ndarray,
+        edges: npy.ndarray) -> npy.ndarray:
+    # Counts the edges of each event's bin that are at or below its value.
+    # The edges and values are replaced by their bin times a stride plus
+    # their rank among every edge, so one searchsorted finds them all
+    # without an array of every event's edges.
+    unique = npy.unique(edges[~npy.isnan(edges)])
+    stride = len(unique) + 2
+
+    # NaN edges rank above every value, so they're never counted
+    edge_keys = npy.searchsorted(unique, edges, "left") + 1
+    edge_keys += npy.arange(len(edges))[:, None] * stride
+    edge_keys = npy.maximum.accumulate(edge_keys, axis=1).ravel()
+
+    value_keys = npy.searchsorted(unique, values, "right")
+    value_keys[npy.isnan(values)] = 0
+    value_keys += flat * stride
+
+    local = npy.searchsorted(edge_keys, value_keys, "right")
+    return local - flat * edges.shape[1]
+
+
+def _get_fixed_edges(
+        flat: npy.ndarray, bin_count: int, values: npy.ndarray,
+        count: int) -> npy.ndarray:
+    # Ranks the values inside of each bin so far, the values are sorted
+    # once, then a stable sort by bin keeps them sorted inside each bin.
+    # Each bin is split where the ranks cross a multiple of size / count.
+    order = npy.argsort(values)
+    order = order[_argsort_bins(flat[order], bin_count)]
+    ranked = values[order]
+
+    sizes = npy.bincount(flat, minlength=bin_count)[:, None]
+    starts = npy.cumsum(sizes) - sizes[:, 0]
+    splits = -(-npy.arange(1, count) * sizes // count)  # Rounded up
+
+    edges = npy.full((bin_count, count - 1), npy.inf)
+    has_edge = splits < sizes
+    edges[has_edge] = ranked[(starts[:, None] + splits)[has_edge]]
+    return edges
+
+
+def _argsort_bins(flat: npy.ndarray, bin_count: int) -> npy.ndarray:
+    # NumPy radix sorts 16 bit integers, which is several times faster
+    # than its stable sort of the full index.
+    if bin_count <= npy.iinfo(npy.uint16).max + 1:
+        flat = flat.astype(npy.uint16)
+    return npy.argsort(flat, kind="stable")
+
+
+def _get_bin_names(settings: Dict[str, Any]) -> List[str]:
+    """Names of each bin of a queued binning, in order of their number"""
+    names = [str(index) for index in range(settings["count"])]
+    if settings["type"] == "width":
+        return ["lower"] + names + ["upper"]
+    return names
+
+
+def group_by_bin(
+        flat: npy.ndarray,
+        bin_count: int) -> Tuple[npy.ndarray, npy.ndarray]:
+    """Groups the events by their flat bin index with a single sort
+
+    :return: The event indexes sorted by bin, and the offsets of each bin
+        in the sorted indexes, so bin i is order[bounds[i]:bounds[i + 1]]
+    """
+    # A stable sort keeps the events of each bin in their original order
+    order = _argsort_bins(flat, bin_count)
+    bounds = npy.zeros(bin_count + 1, npy.intp)
+    npy.cumsum(npy.bincount(flat, minlength=bin_count), out=bounds[1:])
+    return order, bounds
 
 
 class BinFactory:
 
-    def __init__(self, slot: slot_table.DataSlot):
+    def __init__(self, slot: slot_table.DataSlot, processes: int = 1):
         self.__slot = slot
-        if "bin_data" not in slot.extra_data:
-            make_bin_table(slot)
-        self.__bins = slot.get_data("bin_data").read()
+
+        # Bin data that doesn't cover the slot is calculated again
+        if "bin_data" not in slot.extra_data or \
+                len(slot.get_data("bin_data")) != len(slot):
+            make_bin_table(slot, processes)
+        self.__bins = slot.get_data("bin_data")
         self.__queue = OrderedDict()
-        self.__tree = dict()
+        self.__edges: List[npy.ndarray] = None
+        self.__tree: Dict[str, Any] = None
+
+    def add_variable(
+            self, name: str, function: Callable[[Any], npy.ndarray]):
+        """Adds a user defined variable that can be binned by its name
 
-        self.__fixed = _BinFixed(self.__bins, self.__queue)
+        The variable is calculated by the function a chunk of the root at
+        a time, see add_bin_variable.
+        """
+        add_bin_variable(self.__slot, name, function)
+        self.__bins = self.__slot.get_data("bin_data")
 
     def add_fixed_range(
-            self, variable: BinType, lower: int, upper: int, count: int):
+            self, variable: Union[BinType, str], lower: int, upper: int,
+            count: int):
+        self.__check_variable(variable)
         self.__queue[len(self.__queue)] = {
             "type": "width",
             "variable": variable,
@@ -188,50 +408,95 @@ class BinFactory:
             "count": count
         }
 
-    def add_fixed_count(self, variable: BinType, count: int):
+    def add_fixed_count(self, variable: Union[BinType, str], count: int):
+        """Queues count bins that each hold the same number of events
+
+        The bin edges are picked from the events in each of the bins
+        queued before it, so every bin above it is split evenly.
+        """
+        self.__check_variable(variable)
         self.__queue[len(self.__queue)] = {
             "type": "fixed",
             "variable": variable,
             "count": count
         }
 
+    def __check_variable(self, variable: Union[BinType, str]):
+        if _get_column(variable) not in self.__bins.colnames:
+            raise ValueError(f"Unknown binning variable {variable}!")
+
     def clear(self):
         self.__queue.clear()
+        self.__edges = None
+        self.__tree = None
 
     def execute(self):
-        self.__tree = self.__production_loop()
+        """Finds the edges of the queued bins
+
+        Only fixed count bins read from the bin data, and then only the
+        columns of the variables that are binned.
+        """
+        bins = None
+        if any(value["type"] == "fixed" for value in self.__queue.values()):
+            bins = slot_table.read_columns(self.__bins, self.__variables)
+        self.__edges = get_bin_edges(bins, self.__queue)
+        self.__tree = None
+
+    def iter_bin_index(
+            self, chunk_size: int = _EVENT_CHUNK) -> Iterator[npy.ndarray]:
+        """Iterates over the flat bin index of each chunk of events"""
+        if self.__edges is None:
+            self.execute()
+
+        for start in range(0, len(self.__bins), chunk_size):
+            bins = slot_table.read_columns(
+                self.__bins, self.__variables, start, start + chunk_size
+            )
+            yield get_bin_index(bins, self.__queue, self.__edges)[0]
 
-    def __production_loop(
-            self, position: int = 0, previous: npy.ndarray = True
-    ) -> Dict[int, npy.ndarray]:
+    @property
+    def __variables(self) -> List[str]:
+        variables = [_get_column(v["variable"]) for v in self.__queue.values()]
+        return list(dict.fromkeys(variables))
 
-        temp_storage = dict()
-        truth_table_dict = self.__get_truth_tables(position, previous)
+    @property
+    def shape(self) -> List[int]:
+        """Number of bins in each queued binning"""
+        return [len(names) for names in self.bin_names]
 
-        for key, truth_table in truth_table_dict.items():
-            if len(self.__queue) - 1 == position:
-                temp_storage[key] = npy.logical_and(truth_table, previous)
+    @property
+    def bin_names(self) -> List[List[str]]:
+        """Names of the bins in each queued binning, in order"""
+        return [_get_bin_names(value) for value in self.__queue.values()]
+
+    def __make_tree(
+            self, order: npy.ndarray, bounds: npy.ndarray,
+            position: int = 0, previous: int = 0) -> Dict[str, Any]:
+        tree = dict()
+        names = self.bin_names[position]
+        for local, name in enumerate(names):
+            flat = previous * len(names) + local
+            if position == len(self.__queue) - 1:
+                tree[name] = order[bounds[flat]:bounds[flat + 1]]
             else:
-                temp_storage[key] = self.__production_loop(
-                    position + 1, truth_table
+                tree[name] = self.__make_tree(
+                    order, bounds, position + 1, flat
                 )
-        return truth_table_dict
-
-    def __get_truth_tables(
-            self, position, previous: npy.ndarray = True
-    ) -> Dict[Any, npy.ndarray]:
-
-        if not isinstance(previous, npy.ndarray):
-            previous = npy.ones(len(self.__slot), bool)
-
-        if self.__queue[position]["type"] == "width":
-            return bin_by_width(self.__bins, self.__queue, position)
-        else:
-            # TODO: Actually implement this functionality
-            raise NotImplementedError("Fixed bins are still a WIP")
+        return tree
 
     @property
-    def produced_truth_table(self):
+    def produced_truth_table(self) -> Dict[str, Any]:
+        """Nested dictionary of the events in each bin
+
+        Every binning adds a level keyed by "lower", "upper" and the bin
+        number, the innermost values are the sorted indexes of the events
+        in that bin. This holds the bin of every event in memory, use
+        BinSlot.stream_bins for slots larger than memory.
+        """
+        if self.__tree is None:
+            flat = npy.concatenate(list(self.iter_bin_index()))
+            order, bounds = group_by_bin(flat, int(npy.prod(self.shape)))
+            self.__tree = self.__make_tree(order, bounds)
         return self.__tree
 
 
@@ -255,10 +520,89 @@ class BinSlot(slot_table.CustomSlot):
     def bin(self, truth_table: Dict[Any, npy.ndarray]):
         self.__make_bin_slot()
         metadata = self.__create_metadata(truth_table)
-        self.__slot_to_bin(metadata, truth_table, self.__bin_group)
+
+        # Each array is read once, then every bin takes its events from it
+        data = dict()
+        for name in self.__data_group._v_leaves.keys():
+            data[name] = getattr(self.__data_group, name).read()
+        self.__slot_to_bin(data, truth_table, self.__bin_group)
+        self.__file.flush()
+        self.__write_metadata(metadata)
+
+    def stream_bins(
+            self, factory: BinFactory, chunk_size: int = _EVENT_CHUNK):
+        """Copies the events into their bins a chunk at a time
+
+        Every array of the slot is read one chunk at a time, and the
+        events of each bin are appended to that bin's copy of the array,
+        so only one chunk is held in memory.
+        """
+        self.__make_bin_slot()
+        leaves = [
+            getattr(self.__data_group, name)
+            for name in self.__data_group._v_leaves.keys()
+        ]
+        bins = [
+            self.__make_bin_leaves(names, leaves)
+            for names in itertools.product(*factory.bin_names)
+        ]
+
+        totals = npy.zeros(len(bins), npy.int64)
+        start = 0
+        for flat in factory.iter_bin_index(chunk_size):
+            stop = start + len(flat)
+            order, bounds = group_by_bin(flat, len(bins))
+            totals += npy.diff(bounds)
+
+            for index, leaf in enumerate(leaves):
+                chunk = leaf.read(start, stop)[order]
+                for bin_index in npy.flatnonzero(npy.diff(bounds)):
+                    lower, upper = bounds[bin_index:bin_index + 2]
+                    bins[bin_index][index].append(chunk[lower:upper])
+            start = stop
+
         self.__file.flush()
+        if start != len(self.__data_slot):
+            raise RuntimeError(
+                f"Only {start} of {len(self.__data_slot)} events were binned!"
+            )
+
+        metadata = self.__count_metadata(
+            factory.bin_names, totals.reshape(factory.shape)
+        )
         self.__write_metadata(metadata)
 
+    def __make_bin_leaves(
+            self, names: Tuple[str], leaves: List[tables.Leaf]
+    ) -> List[tables.Leaf]:
+        path = "/".join((self.__bin_group._v_pathname,) + names)
+        group = self.__file.create_group(
+            *path.rsplit("/", 1), createparents=True
+        )
+
+        copies = []
+        for leaf in leaves:
+            if leaf.dtype.names:
+                copies.append(self.__file.create_table(
+                    group, leaf.name, npy.zeros(0, leaf.dtype)
+                ))
+            else:
+                copies.append(self.__file.create_earray(
+                    group, leaf.name, leaf.atom, (0,) + leaf.shape[1:]
+                ))
+        return copies
+
+    def __count_metadata(
+            self, names: List[List[str]],
+            totals: npy.ndarray) -> Dict[str, Any]:
+        metadata = dict()
+        for name, total in zip(names[0], totals):
+            if len(names) > 1:
+                metadata[name] = self.__count_metadata(names[1:], total)
+            else:
+                metadata[name] = {"total": int(total)}
+        return metadata
+
     def __make_bin_slot(self):
         if self.__data_slot.group_name in self.__group._v_groups.keys():
             self.__file.remove_node(
@@ -277,23 +621,22 @@ class BinSlot(slot_table.CustomSlot):
                 metadata[leaf] = self.__create_metadata(truth_table[leaf])
             else:
                 metadata[leaf] = {
-                    "total": int(truth_table[leaf].sum())
+                    "total": len(truth_table[leaf])
                 }
         return metadata
 
     def __slot_to_bin(self,
-                      metadata: Dict[int, Any],
-                      truth: Dict[int, Any],
+                      data: Dict[str, npy.ndarray],
+                      truth: Dict[Any, Any],
                       current_group: tables.Group):
         for leaf in truth.keys():
             if isinstance(truth[leaf], dict):
                 child = self.__file.create_group(current_group, str(leaf))
-                self.__slot_to_bin(metadata[leaf], truth[leaf], child)
+                self.__slot_to_bin(data, truth[leaf], child)
             else:
                 child = self.__file.create_group(current_group, str(leaf))
-                for array in self.__data_group._v_leaves.keys():
-                    data = getattr(self.__data_group, array)
-                    new_array = data.read_coordinates(truth[leaf])
+                for array in data.keys():
+                    new_array = data[array][truth[leaf]]
                     if new_array.dtype.names:
                         self.__file.create_table(child, array, new_array)
                     else:
@@ -17,42 +17,77 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """
-Pickle Cache
-------------
-Stores the data in a python pickle so that it can be easily read at a
-future time. Takes advantage of SHA512 file hashing to determine if the
-source file hash changed since its contents were previously loaded.
+Columnar Cache
+--------------
+Stores the data as raw NumPy arrays next to a small JSON header, so that
+the validity of the cache can be checked without reading the data, and
+the data itself can be memory mapped instead of loaded.
+
+The source file is checked in tiers so that a cache hit doesn't need to
+read the whole source. The size, modification time, and inode are
+compared first, and if they differ a hash of sampled blocks of the file
+is compared instead. With "full" validation the SHA512 of the entire
+source file is compared every time.
+
+Layout of the cache directory:
+
+- header.json: The source fingerprint, the layout, and the dtype.
+- data.npy: The array, if the data was a single array.
+- particle_N.npy: Each particle, if the data was a ParticlePool.
+- data.pickle: Anything else that isn't an array.
 """
 
+import json
 import pickle
+import shutil
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List
+
+import numpy as npy
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.file import misc
+from PyPWA.libs.math import vectors
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
 __version__ = VERSION
 
 
+_HEADER = "header.json"
+VALIDATION = ("fast", "full")
+
+
 @dataclass
 class _Package:
     """
-    Stores the contents of any data that is loaded, as well as file
-    source file hash, and the location of the cache.
+    Stores the contents of any data that is loaded, as well as the
+    source file, how it's validated, and the location of the cache.
 
     .. note::
-        This is used both for finding the pickle and creating the
-        pickle.
+        This is used both for finding the cache and creating the
+        cache.
     """
-    hash: str = None
+    source: Path = None
     location: Path = None
+    validation: str = "fast"
+    columns: List[str] = None
+    precision: str = None
     data: Any = None
 
 
+def _get_fingerprint(package: _Package) -> Dict[str, Any]:
+    fingerprint = {
+        "stat": misc.get_file_stat(package.source),
+        "sampled_hash": misc.get_sampled_hash(package.source)
+    }
+    if package.validation == "full":
+        fingerprint["hash"] = misc.get_sha512_hash(package.source)
+    return fingerprint
+
+
 class _IWrite(ABC):
 
     @abstractmethod
@@ -74,37 +109,89 @@ class _IRead(ABC):
 
 class _ReadCache(_IRead):
 
+    """Only reads the header until the data is requested
+
+    The arrays are memory mapped copy-on-write, so the data can be
+    modified without changing the cache.
+    """
+
     def __init__(self, package: _Package):
         self.__package = package
+        self.__header: Dict[str, Any] = dict()
         self.__did_read = False
-        self.__graciously_load_cache()
+        self.__is_valid: bool = None
+        self.__graciously_load_header()
 
     def __repr__(self) -> str:
         return "{0}({1})".format(self.__class__.__name__, self.__package)
 
-    def __graciously_load_cache(self):
+    def __graciously_load_header(self):
         try:
-            self.__load_data()
+            with (self.__package.location / _HEADER).open() as stream:
+                self.__header = json.load(stream)
             self.__did_read = True
         except Exception:
             self.__did_read = False
 
-    def __load_data(self):
-        with self.__package.location.open("rb") as stream:
-            self.__package = pickle.load(stream)
-
     def get_cache(self) -> Any:
         if self.is_valid:
-            return self.__package.data
+            return self.__load_data()
         else:
             raise RuntimeError("No valid data.")
 
+    def __load_data(self) -> Any:
+        location = self.__package.location
+        layout = self.__header["layout"]
+
+        if layout == "array":
+            data = npy.load(location / "data.npy", mmap_mode="c")
+            if self.__package.columns:
+                return misc.select_columns(data, self.__package.columns)
+            return data
+
+        elif layout == "particles":
+            particles = []
+            for index, particle_id in enumerate(self.__header["particles"]):
+                array = npy.load(
+                    location / f"particle_{index}.npy", mmap_mode="c"
+                )
+                particles.append(vectors.Particle(
+                    particle_id, array, precision=array.dtype[0].type
+                ))
+            return vectors.ParticlePool(particles)
+
+        else:
+            with (location / "data.pickle").open("rb") as stream:
+                return pickle.load(stream)
+
     @property
     def is_valid(self) -> bool:
-        if self.__package.hash == self.__package.hash and self.__did_read:
+        if self.__is_valid is None:
+            self.__is_valid = self.__did_read and \
+                self.__has_columns() and self.__has_precision() and \
+                self.__source_matches()
+        return self.__is_valid
+
+    def __has_columns(self) -> bool:
+        # A cache of only some columns can't be used for all columns
+        cached = self.__header.get("columns")
+        requested = self.__package.columns
+        if not cached:
             return True
-        else:
-            return False
+        return bool(requested) and set(requested) <= set(cached)
+
+    def __has_precision(self) -> bool:
+        return self.__header.get("precision") == self.__package.precision
+
+    def __source_matches(self) -> bool:
+        source = self.__package.source
+        if self.__package.validation == "full":
+            return self.__header.get("hash") == misc.get_sha512_hash(source)
+
+        if self.__header.get("stat") == misc.get_file_stat(source):
+            return True
+        sampled_hash = misc.get_sampled_hash(source)
+        return self.__header.get("sampled_hash") == sampled_hash
 
 
 class _ClearCache(_IRead):
@@ -126,7 +213,7 @@ class _ClearCache(_IRead):
     def __attempt_to_remove_cache(self):
         try:
             if self.__package.location.exists():
-                self.__package.location.unlink()
+                shutil.rmtree(self.__package.location)
         except Exception:
             pass
 
@@ -146,6 +233,12 @@ class _NoRead(_IRead):
 
 class _WriteCache(_IWrite):
 
+    """Writes the arrays first and the header last
+
+    A cache that failed part way through won't have a header, and
+    therefore will never be considered valid.
+    """
+
     def __init__(self, package: _Package):
         self.__package = package
 
@@ -157,12 +250,47 @@ class _WriteCache(_IWrite):
         self.__try_to_write_cache()
 
     def __try_to_write_cache(self):
+        location = self.__package.location
         try:
-            with self.__package.location.open("wb") as stream:
-                pickle.dump(self.__package, stream)
+            if location.exists():
+                shutil.rmtree(location)
+            location.mkdir(parents=True)
+
+            header = self.__write_data(location, self.__package.data)
+            header.update(_get_fingerprint(self.__package))
+            header["columns"] = self.__package.columns
+            header["precision"] = self.__package.precision
+            with (location / _HEADER).open("w") as stream:
+                json.dump(header, stream)
         except Exception:
             pass
 
+    @staticmethod
+    def __write_data(location: Path, data: Any) -> Dict[str, Any]:
+        if isinstance(data, npy.ndarray) and not data.dtype.hasobject:
+            npy.save(location / "data.npy", data, allow_pickle=False)
+            return {"layout": "array", "dtype": str(data.dtype)}
+
+        elif isinstance(data, vectors.ParticlePool):
+            particle_ids = []
+            for index, particle in enumerate(data.iter_particles()):
+                npy.save(
+                    location / f"particle_{index}.npy",
+                    particle.get_array(), allow_pickle=False
+                )
+                particle_ids.append(particle.id)
+
+            dtype = str(data.stored[0].get_array().dtype)
+            return {
+                "layout": "particles", "dtype": dtype,
+                "particles": particle_ids
+            }
+
+        else:
+            with (location / "data.pickle").open("wb") as stream:
+                pickle.dump(data, stream)
+            return {"layout": "pickle", "dtype": None}
+
 
 class _NoWrite(_IWrite):
 
@@ -206,37 +334,51 @@ class Cache:
     def read_cache(self) -> Any:
         """
         :raises RuntimeError: If cache is invalid.
-        :return: The data that was stored in the pickle
+        :return: The data that was stored in the cache
         """
         return self.__read_cache.get_cache()
 
 
 class CacheFactory:
 
-    def __init__(self, use_cache: bool = True, clear_cache: bool = False):
+    def __init__(
+            self, use_cache: bool = True, clear_cache: bool = False,
+            validation: str = "fast"):
         """
         Produces the cache object for the specific file that is
         provided.
         :param use_cache: If False, caching will be disabled
         :param clear_cache: If True, current cache will be removed even if
             valid. Will remove cache even if use_cache is False.
+        :param validation: "fast" to compare the file's stat and then a
+            sampled hash, or "full" to compare the SHA512 of the entire
+            source file.
         """
         self.__use_cache = use_cache
         self.__clear_cache = clear_cache
+        self.validation = validation
 
     def __repr__(self) -> str:
         return (f"{self.__class__.__name__}"
-                f"({self.__use_cache}, {self.__clear_cache})")
-
-    def get_cache(self, file_location: Path) -> Cache:
-        try:
-            file_hash = misc.get_sha512_hash(file_location)
-        except FileNotFoundError:
-            file_hash = ""
+                f"({self.__use_cache}, {self.__clear_cache}, "
+                f"{self.__validation!r})")
 
+    def get_cache(
+            self, file_location: Path, columns: List[str] = None,
+            precision: npy.floating = None) -> Cache:
+        """
+        :param file_location: The source file of the data
+        :param columns: Only these columns are cached, and a cache of
+            all the columns is valid for any of its columns.
+        :param precision: The float precision the data was parsed with,
+            a cache is only valid for the same precision.
+        """
         package = _Package(
-            hash=file_hash,
-            location=misc.get_cache_uri() / (file_location.stem + ".pickle")
+            source=file_location,
+            location=misc.get_cache_uri() / (file_location.stem + ".cache"),
+            validation=self.__validation,
+            columns=list(columns) if columns else None,
+            precision=npy.dtype(precision).name if precision else None
         )
         reader = self.__get_reader(package)
         writer = self.__get_writer(package)
@@ -245,7 +387,7 @@ class CacheFactory:
     def __get_reader(self, package: _Package) -> _IRead:
         if self.__clear_cache:
             return _ClearCache(package)
-        elif not self.__use_cache or not package.hash:
+        elif not self.__use_cache or not package.source.exists():
             return _NoRead()
         else:
             return _ReadCache(package)
@@ -277,3 +419,14 @@ class CacheFactory:
             self.__clear_cache = clear_cache
         else:
             raise ValueError("clear_cache must be boolean")
+
+    @property
+    def validation(self) -> str:
+        return self.__validation
+
+    @validation.setter
+    def validation(self, validation: str):
+        if validation in VALIDATION:
+            self.__validation = validation
+        else:
+            raise ValueError(f"validation must be one of {VALIDATION}")
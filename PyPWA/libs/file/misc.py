@@ -23,10 +23,14 @@ Miscellaneous file tools.
 
 import hashlib
 from pathlib import Path
+from typing import Any, Dict, List
 
 import appdirs
+import numpy as npy
+from numpy.lib import recfunctions
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.math import vectors
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
@@ -34,6 +38,8 @@ __version__ = VERSION
 
 
 _BUFFER = 40960
+_SAMPLES = 16
+_SAMPLE_SIZE = 65536
 
 
 def get_cache_uri() -> Path:
@@ -59,6 +65,37 @@ def get_sha512_hash(file_location: Path) -> str:
     return file_hash.hexdigest()
 
 
+def get_sampled_hash(file_location: Path) -> str:
+    """Fast hash from evenly spaced blocks of the file
+
+    Only reads a fixed amount of the file no matter its size, so it can
+    miss changes that keep the size and fall between the sampled blocks.
+    Small files are hashed entirely.
+    """
+    size = file_location.stat().st_size
+    file_hash = hashlib.blake2b(str(size).encode())
+
+    with file_location.open("rb") as stream:
+        if size <= _SAMPLES * _SAMPLE_SIZE:
+            file_hash.update(stream.read())
+        else:
+            step = (size - _SAMPLE_SIZE) // (_SAMPLES - 1)
+            for index in range(_SAMPLES):
+                stream.seek(index * step)
+                file_hash.update(stream.read(_SAMPLE_SIZE))
+
+    return file_hash.hexdigest()
+
+
+def get_file_stat(file_location: Path) -> Dict[str, int]:
+    """The size, modification time, and inode of the file"""
+    stat = file_location.stat()
+    return {
+        "size": stat.st_size, "mtime": stat.st_mtime_ns,
+        "inode": stat.st_ino
+    }
+
+
 def get_file_length(file_location: Path) -> int:
     with file_location.open("rb") as binary_stream:
         last_chunk = binary_stream.raw.read(_BUFFER)
@@ -72,3 +109,44 @@ def get_file_length(file_location: Path) -> int:
         if last_chunk.endswith(b'\n\n'):
             lines -= 1
     return lines
+
+
+def select_columns(data: npy.ndarray, columns: List[str]) -> npy.ndarray:
+    """Copies only the columns out of the structured array
+
+    :raises ValueError: If the data doesn't have one of the columns, or
+        isn't a structured array.
+    """
+    names = getattr(getattr(data, "dtype", None), "names", None)
+    if not names:
+        raise ValueError("Columns can only be selected from structured data")
+
+    missing = [column for column in columns if column not in names]
+    if missing:
+        raise ValueError(f"Data has no columns {missing}!")
+
+    return recfunctions.repack_fields(data[list(columns)])
+
+
+def set_precision(data: Any, precision: npy.floating) -> Any:
+    """Casts every float column of the data to the precision
+
+    Works with structured arrays, plain arrays and ParticlePools, data
+    that is already at the precision isn't copied.
+    """
+    if isinstance(data, vectors.ParticlePool):
+        return vectors.ParticlePool([
+            vectors.Particle(p.id, set_precision(p.get_array(), precision))
+            for p in data.iter_particles()
+        ])
+
+    if not data.dtype.names:
+        if npy.issubdtype(data.dtype, npy.floating):
+            return data.astype(precision, copy=False)
+        return data
+
+    dtype = [
+        (name, precision if npy.issubdtype(kind, npy.floating) else kind)
+        for name, (kind, _) in data.dtype.fields.items()
+    ]
+    return data.astype(dtype, copy=False)
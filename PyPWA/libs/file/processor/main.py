@@ -22,12 +22,12 @@ Main object for Parsing Data
 
 import logging
 from pathlib import Path
-from typing import Union
+from typing import List, Union
 
 import numpy as npy
 
 from PyPWA import AUTHOR, VERSION
-from PyPWA.libs.file import cache
+from PyPWA.libs.file import cache, misc
 from PyPWA.libs.math import vectors
 from PyPWA.plugins import load, data as data_plugins
 from . import templates
@@ -64,40 +64,72 @@ class _DataLoader:
 
     __LOGGER = logging.getLogger(__name__ + "._DataLoader")
 
-    def __init__(self, use_cache: bool, clear_cache: bool):
-        self.__args = (use_cache, clear_cache)
-        self.__cache_builder = cache.CacheFactory(use_cache, clear_cache)
+    def __init__(
+            self, use_cache: bool, clear_cache: bool,
+            validation: str = "fast"):
+        self.__args = (use_cache, clear_cache, validation)
+        self.__cache_builder = cache.CacheFactory(
+            use_cache, clear_cache, validation
+        )
 
     def __repr__(self):
         return (f"{self.__class__.__name__}"
-                f"({self.__args[0]}, {self.__args[1]})")
-
-    def parse(self, filename: Path) -> npy.ndarray:
-        cache_obj = self.__cache_builder.get_cache(filename)
+                f"({self.__args[0]}, {self.__args[1]}, {self.__args[2]!r})")
+
+    def parse(
+            self, filename: Path, mmap_mode: str = None,
+            columns: List[str] = None,
+            precision: npy.floating = None) -> npy.ndarray:
+        if mmap_mode:
+            parser = _get_read_plugin(filename).get_memory_parser()
+            if isinstance(parser, templates.IMemoryMap):
+                self.__LOGGER.info("Memory mapping %s" % filename)
+                data = parser.memory_map(filename, mmap_mode)
+                if columns:
+                    data = misc.select_columns(data, columns)
+                return misc.set_precision(data, precision) \
+                    if precision else data
+
+        cache_obj = self.__cache_builder.get_cache(
+            filename, columns, precision
+        )
         if cache_obj.is_valid:
             self.__LOGGER.info("Loading cache for %s" % filename)
             return cache_obj.read_cache()
         else:
             self.__LOGGER.info("No cache found, loading file directly.")
-            return self.__read_data(cache_obj, filename)
+            return self.__read_data(cache_obj, filename, columns, precision)
 
     @staticmethod
-    def __read_data(cache_obj, filename):
-        plugin = _get_read_plugin(filename)
-        data = plugin.get_memory_parser().parse(filename)
+    def __read_data(cache_obj, filename, columns, precision):
+        parser = _get_read_plugin(filename).get_memory_parser()
+        if (columns or precision) and \
+                isinstance(parser, templates.IColumnMemory):
+            data = parser.parse_columns(filename, columns, precision)
+        else:
+            data = parser.parse(filename)
+            if columns:
+                data = misc.select_columns(data, columns)
+            if precision:
+                data = misc.set_precision(data, precision)
+
         cache_obj.write_cache(data)
         return data
 
 
 class _DataDumper:
 
-    def __init__(self, use_cache: bool, clear_cache: bool):
-        self.__args = (use_cache, clear_cache)
-        self.__cache_builder = cache.CacheFactory(use_cache, clear_cache)
+    def __init__(
+            self, use_cache: bool, clear_cache: bool,
+            validation: str = "fast"):
+        self.__args = (use_cache, clear_cache, validation)
+        self.__cache_builder = cache.CacheFactory(
+            use_cache, clear_cache, validation
+        )
 
     def __repr__(self):
         return (f"{self.__class__.__name__}"
-                f"({self.__args[0]}, {self.__args[1]})")
+                f"({self.__args[0]}, {self.__args[1]}, {self.__args[2]!r})")
 
     def write(self, filename: Path, data: SUPPORTED_DATA):
         parser = self.__get_write_plugin(filename, data).get_memory_parser()
@@ -121,18 +153,36 @@ class _DataDumper:
 
 class DataProcessor:
 
-    def __init__(self, enable_cache=False, clear_cache=False):
-        self.__args = (enable_cache, clear_cache)
-        self.__loader = _DataLoader(enable_cache, clear_cache)
-        self.__dumper = _DataDumper(enable_cache, clear_cache)
+    def __init__(
+            self, enable_cache=False, clear_cache=False, validation="fast"):
+        self.__args = (enable_cache, clear_cache, validation)
+        self.__loader = _DataLoader(enable_cache, clear_cache, validation)
+        self.__dumper = _DataDumper(enable_cache, clear_cache, validation)
 
     def __repr__(self):
         return (f"{self.__class__.__name__}"
-                f"({self.__args[0]}, {self.__args[1]})")
-
-    def parse(self, filename: Union[Path, str]) -> SUPPORTED_DATA:
+                f"({self.__args[0]}, {self.__args[1]}, {self.__args[2]!r})")
+
+    def parse(
+            self, filename: Union[Path, str],
+            mmap_mode: str = None,
+            columns: List[str] = None,
+            precision: npy.floating = None) -> SUPPORTED_DATA:
+        """
+        :param filename: The file to parse
+        :param mmap_mode: If set and the file's plugin supports it, the
+            file is memory mapped with this mode instead of loaded, see
+            numpy.memmap for the modes. Memory mapped files skip the
+            cache.
+        :param columns: If set, only these columns are parsed and
+            cached. Only supported for structured data.
+        :param precision: If set, the floats are parsed into this
+            precision instead of the file's precision, such as
+            numpy.float32 to halve the memory used.
+        :return: The data inside the file
+        """
         f = filename if isinstance(filename, Path) else Path(filename)
-        return self.__loader.parse(f)
+        return self.__loader.parse(f, mmap_mode, columns, precision)
 
     @staticmethod
     def get_reader(filename: Union[Path, str]) -> templates.ReaderBase:
@@ -22,12 +22,14 @@ data module.
 """
 
 import enum
+import itertools
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List, Optional as Opt
 
 import numpy as npy
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.math import vectors
 from pathlib import Path
 
 __credits__ = ["Mark Jones"]
@@ -52,6 +54,30 @@ class IMemory(ABC):
         ...
 
 
+class IMemoryMap(ABC):
+
+    """Memory parsers that can memory map the file instead of loading it"""
+
+    @abstractmethod
+    def memory_map(self, filename: Path, mmap_mode: str) -> npy.ndarray:
+        ...
+
+
+class IColumnMemory(ABC):
+
+    """Memory parsers that can parse only some of the columns
+
+    They can also parse the values straight into another float
+    precision, such as float32, instead of converting afterwards.
+    """
+
+    @abstractmethod
+    def parse_columns(
+            self, filename: Path, columns: Opt[List[str]],
+            precision: npy.floating = None) -> npy.ndarray:
+        ...
+
+
 class ReaderBase(ABC):
 
     @abstractmethod
@@ -70,6 +96,37 @@ class ReaderBase(ABC):
     def __iter__(self):
         return self
 
+    def read_chunk(self, size: int) -> npy.ndarray:
+        """
+        Reads the next events all at once. Plugins should override this
+        with a native implementation, this fallback only collects events
+        from next, and doesn't support ParticlePools.
+
+        :param int size: The max number of events to read.
+        :return: A contiguous array of up to size events, fewer if the
+            end of the file is reached.
+        :raises StopIteration: If there are no events left.
+        """
+        events = [
+            npy.atleast_1d(npy.copy(event))
+            for event in itertools.islice(self, size)
+        ]
+        if not events:
+            raise StopIteration
+        return npy.concatenate(events)
+
+    def iter_chunks(self, size: int) -> Iterator[npy.ndarray]:
+        """
+        Iterates over the remaining events in chunks from read_chunk.
+
+        :param int size: The max number of events in each chunk.
+        """
+        while True:
+            try:
+                yield self.read_chunk(size)
+            except StopIteration:
+                return
+
     def __enter__(self):
         return self
 
@@ -124,6 +181,20 @@ class WriterBase(ABC):
         """
         ...
 
+    def write_chunk(self, data: npy.ndarray):
+        """
+        Writes many events at once. Plugins should override this with a
+        native implementation, this fallback passes every event to write.
+
+        :param data: A structured array or ParticlePool of events.
+        """
+        if isinstance(data, vectors.ParticlePool):
+            for event in data.iter_events():
+                self.write(event)
+        else:
+            for index in range(len(data)):
+                self.write(data[index:index + 1])
+
     def __enter__(self):
         return self
 
@@ -17,7 +17,7 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional as Opt, Union
 
 import numpy as npy
 import tables
@@ -40,20 +40,46 @@ __version__ = VERSION
 
 root_type = Union[npy.ndarray, vectors.ParticlePool]
 
+_COPY_ROWS = 100000  # Rows copied at a time while repacking
+
 
 def iter_root(
         root: Union["ParticleLeaf", tables.Table],
-        chunk_size: int = 5000) -> npy.ndarray:
+        chunk_size: int = 5000,
+        columns: List[str] = None) -> npy.ndarray:
+
+    if columns and not isinstance(root, tables.Table):
+        raise ValueError("Columns can only be selected from tables")
 
     for lower in range(0, len(root), chunk_size):
-        yield root.read(lower, lower + chunk_size)
+        if columns:
+            yield read_columns(root, columns, lower, lower + chunk_size)
+        else:
+            yield root.read(lower, lower + chunk_size)
+
 
+def read_columns(
+        table: tables.Table, columns: List[str],
+        start: int = 0, stop: int = None) -> npy.ndarray:
+    """Reads only the requested columns of the table's rows"""
+    stop = len(table) if stop is None else min(stop, len(table))
+    dtype = [(column, table.coldtypes[column]) for column in columns]
 
-class _Particle(tables.IsDescription):
-    x = tables.Float64Col()
-    y = tables.Float64Col()
-    z = tables.Float64Col()
-    e = tables.Float64Col()
+    array = npy.empty(max(stop - start, 0), dtype)
+    for column in columns:
+        array[column] = table.read(start, stop, field=column)
+    return array
+
+
+def _match_columns(data: npy.ndarray, dtype: npy.dtype) -> npy.ndarray:
+    """Lines the data's columns up with the table's by name"""
+    if data.dtype == dtype:
+        return data
+
+    rows = npy.zeros(len(data), dtype)
+    for name in data.dtype.names:
+        rows[name] = data[name]
+    return rows
 
 
 class ParticleLeaf:
@@ -61,41 +87,46 @@ class ParticleLeaf:
     def __init__(self, leaves: List[tables.Table]):
         self.__leaves = leaves
         self.__ids = [int(pid.name.split("_")[2]) for pid in leaves]
-        self.__pool = self.__create_empty_particle_pool()
-
-    def __create_empty_particle_pool(self):
-        particles = [vectors.Particle(pid, 0) for pid in self.__ids]
-        return vectors.ParticlePool(particles)
+        self.__pool = self.empty_pool(0)
 
     def __len__(self):
         return len(self.__leaves[0])
 
-    def read(self, start: int = 0, stop: int = None) -> vectors.ParticlePool:
-        if not stop:
-            values = [leaf.read() for leaf in self.__leaves]
-            self.__replace_particle_pool(values)
-            return self.__pool
-
-        values = self.__get_values(start, stop)
-        if (stop - start) == self.__pool.event_count and stop < len(self):
-            self.__update_particle_pool(values)
-        else:
-            self.__replace_particle_pool(values)
-        return self.__pool
-
-    def __get_values(self, start, stop) -> List[npy.ndarray]:
-        return [leaf.read(start, stop) for leaf in self.__leaves]
+    def empty_pool(self, event_count: int) -> vectors.ParticlePool:
+        """Makes a ParticlePool that rows can be read into with out"""
+        particles = [
+            vectors.Particle(pid, npy.empty(event_count, leaf.dtype))
+            for pid, leaf in zip(self.__ids, self.__leaves)
+        ]
+        return vectors.ParticlePool(particles)
 
-    def __update_particle_pool(self, data: List[npy.ndarray]):
-        for array, particle in zip(data, self.__pool.iter_particles()):
-            particle.e = array["e"]
-            particle.x = array["x"]
-            particle.y = array["y"]
-            particle.z = array["z"]
+    def read(
+            self, start: int = 0, stop: int = None,
+            out: vectors.ParticlePool = None) -> vectors.ParticlePool:
+        """Reads the events from start to stop from every particle
+
+        :param out: Pool the events are read into instead of a new one,
+            it must have exactly stop - start events. Reusing one pool
+            for every chunk avoids allocating new arrays for each read.
+        :return: The pool with the events, when out isn't set this may
+            be the same pool the last read returned.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        count = max(stop - start, 0)
+
+        if out is None:
+            # The last pool is reused for chunks of the same size
+            if count != self.__pool.event_count:
+                self.__pool = self.empty_pool(count)
+            out = self.__pool
+        elif out.event_count != count:
+            raise ValueError(
+                f"Pool has {out.event_count} events, but {count} are read!"
+            )
 
-    def __replace_particle_pool(self, data: List[npy.ndarray]):
-        ps = [vectors.Particle(pid, d) for pid, d in zip(self.__ids, data)]
-        self.__pool = vectors.ParticlePool(ps)
+        for leaf, particle in zip(self.__leaves, out.iter_particles()):
+            leaf.read(start, stop, out=particle.get_array())
+        return out
 
     @property
     def leaves(self):
@@ -137,10 +168,26 @@ class DataSlot:
         self.__check_array_length(data)
         if data.dtype.names:
             self.__file.create_table(self.__group, name, data)
+        elif self.__group._v_filters.complevel and len(data):
+            # Only chunked arrays can be compressed, they use the filters
+            # of the slot.
+            self.__file.create_carray(self.__group, name, obj=data)
         else:
             self.__file.create_array(self.__group, name, data)
         self.__file.flush()
 
+    def add_table(self, name: str, dtype: npy.dtype) -> tables.Table:
+        """Adds an empty table to append data to a chunk at a time
+
+        Unlike add_data the length isn't checked, the table should be
+        filled to the length of the slot.
+        """
+        table = self.__file.create_table(
+            self.__group, name, npy.zeros(0, dtype), expectedrows=len(self)
+        )
+        self.__file.flush()
+        return table
+
     def __check_array_length(self, data: npy.ndarray):
         if len(self) != len(data):
             raise IndexError(
@@ -174,21 +221,18 @@ class DataSlot:
             )
 
     def __append_particle_data(self, data: vectors.ParticlePool):
-        for event in data.iter_events():
-            for p, leaf in zip(event.iter_particles(), self.__root.leaves):
-                row = leaf.row
-                row["x"] = p.x
-                row["y"] = p.y
-                row["z"] = p.z
-                row["e"] = p.e
-                row.append()
+        leaves = self.__root.leaves
+        if data.particle_count != len(leaves):
+            raise ValueError(
+                f"Data has {data.particle_count} particles, but the slot"
+                f" has {len(leaves)}!"
+            )
+
+        for particle, leaf in zip(data.iter_particles(), leaves):
+            leaf.append(_match_columns(particle.get_array(), leaf.dtype))
 
     def __append_table_data(self, data: npy.ndarray):
-        for event in data:
-            row = self.__root.row
-            for name in data.dtype.names:
-                row[name] = event[name]
-            row.append()
+        self.__root.append(_match_columns(data, self.__root.dtype))
 
     def flush(self):
         self.__file.flush()
@@ -205,6 +249,14 @@ class DataSlot:
     def group_name(self) -> str:
         return self.__group._v_name
 
+    @property
+    def file_name(self) -> str:
+        return self.__file.filename
+
+    @property
+    def is_read_only(self) -> bool:
+        return self.__file.mode == "r"
+
 
 class CustomSlot(ABC):
 
@@ -236,28 +288,49 @@ class SlotFactory:
     def add_slot(self, name: str,
                  fields: List[str],
                  is_particle: bool = False,
-                 length: int = 100000):
-        new_slot = self.__file.create_group(self.__group, name)
+                 length: int = 100000,
+                 precision: npy.floating = npy.float64,
+                 filters: tables.Filters = None,
+                 chunk_rows: int = None):
+        """Creates a new empty slot
+
+        :param filters: Compression for everything stored in the slot,
+            uncompressed if not set.
+        :param chunk_rows: Rows in each HDF5 chunk of the root tables,
+            picked by PyTables from the length if not set.
+        """
+        # Every table and extra data made in the group uses its filters
+        new_slot = self.__file.create_group(
+            self.__group, name, filters=filters
+        )
+        shape = (chunk_rows,) if chunk_rows else None
         if is_particle:
-            self.__make_multiple(new_slot, fields, length)
+            self.__make_multiple(new_slot, fields, length, precision, shape)
         else:
-            self.__make_single(new_slot, fields, length)
+            self.__make_single(new_slot, fields, length, precision, shape)
         self.__file.flush()
 
     def __make_multiple(self,
                         slot: tables.Group,
                         ids: List[str],
-                        length: int):
+                        length: int,
+                        precision: npy.floating,
+                        shape: Opt[tuple]):
+        data_type = [(name, precision) for name in "xyze"]
         for index, the_id in enumerate(ids):
             name = "root_p" + str(index) + "_" + str(the_id)
             self.__file.create_table(
-                slot, name, _Particle, expectedrows=length
+                slot, name, npy.zeros(0, data_type), expectedrows=length,
+                chunkshape=shape
             )
 
-    def __make_single(self, slot: tables.Group, ids: List[str], length: int):
-        data_type = [(name, "f8") for name in ids]
+    def __make_single(
+            self, slot: tables.Group, ids: List[str], length: int,
+            precision: npy.floating, shape: Opt[tuple]):
+        data_type = [(name, precision) for name in ids]
         self.__file.create_table(
-            slot, "root", npy.zeros(0, data_type), expectedrows=length
+            slot, "root", npy.zeros(0, data_type), expectedrows=length,
+            chunkshape=shape
         )
 
     def remove_slot(self, name: str):
@@ -287,3 +360,46 @@ class SlotFactory:
         if self.__file.isopen:
             self.__file.flush()
             self.__file.close()
+
+
+def repack(
+        source: Union[Path, str], destination: Union[Path, str],
+        filters: tables.Filters = None, chunk_rows: int = None):
+    """Copies every slot into a new file with new compression
+
+    :param filters: Compression for the new file, uncompressed if not set.
+    :param chunk_rows: Rows in each HDF5 chunk of the copied tables,
+        picked by PyTables from their length if not set.
+    """
+    with tables.open_file(str(source), "r") as old, \
+            tables.open_file(str(destination), "w", filters=filters) as new:
+        for group in old.walk_groups():
+            if group is not old.root:
+                copy = new.create_group(
+                    group._v_parent._v_pathname, group._v_name
+                )
+                group._v_attrs._f_copy(copy)
+
+        for leaf in old.walk_nodes("/", "Leaf"):
+            copy = _copy_leaf(new, leaf, chunk_rows)
+            leaf.attrs._f_copy(copy)
+
+
+def _copy_leaf(
+        new: tables.File, leaf: tables.Leaf,
+        chunk_rows: Opt[int]) -> tables.Leaf:
+    parent = new.get_node(leaf._v_parent._v_pathname)
+
+    if isinstance(leaf, tables.Table):
+        copy = new.create_table(
+            parent, leaf.name, leaf.description, expectedrows=len(leaf),
+            chunkshape=(chunk_rows,) if chunk_rows else None
+        )
+        for chunk in iter_root(leaf, chunk_rows or _COPY_ROWS):
+            copy.append(chunk)
+        return copy
+
+    data = leaf.read()
+    if new.filters.complevel and data.size:
+        return new.create_carray(parent, leaf.name, obj=data)
+    return new.create_array(parent, leaf.name, data)
@@ -54,12 +54,23 @@ def get_s(collection: vectors.ParticlePool) -> npy.ndarray:
     return energy - momenta
 
 
-def get_t_prime(collection: vectors.ParticlePool) -> npy.ndarray:
+def get_t_prime(
+        collection: vectors.ParticlePool,
+        event_mass: npy.ndarray = None,
+        s: npy.ndarray = None,
+        t: npy.ndarray = None) -> npy.ndarray:
+    """Calculates t' of each event
+
+    The event mass, s, and t can be passed in when they're already
+    calculated, so they aren't calculated a second time.
+    """
     # Get initial values
     proton = collection.get_particles_by_name("Proton")[0]
-    s_value = get_s(collection)
+    s_value = get_s(collection) if s is None else s
     sqrt_s = npy.sqrt(s_value)
-    mx2 = get_event_mass(collection)**2
+    if event_mass is None:
+        event_mass = get_event_mass(collection)
+    mx2 = event_mass**2
 
     # Calculate for Px and Ex
     ex = (s_value * mx2 * _PROTON_GEV**2) / 2 * sqrt_s
@@ -70,4 +81,4 @@ def get_t_prime(collection: vectors.ParticlePool) -> npy.ndarray:
     t0_right = (((proton.e * _PROTON_GEV) / sqrt_s) - px)**2
     t0 = t0_left - t0_right
 
-    return get_t(collection) - t0
+    return (get_t(collection) if t is None else t) - t0
@@ -83,7 +83,9 @@ class AbstractVector(object):
             self._vector = numpy.zeros(array, dtype=array_type)
         else:
             self._vector = array
-        self._array_type = array_type
+
+        # Provided arrays keep their own precision
+        self._array_type = getattr(self._vector, "dtype", array_type)
         self.__vector_class = vector_class
 
     def __repr__(self):
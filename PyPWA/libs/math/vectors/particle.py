@@ -140,7 +140,7 @@ class Particle(basic_vectors.FourVector):
         new_vectors = super(Particle, self).split(count)
         new_particles = []
         for vector in new_vectors:
-            new_particles.append(Particle(self.id, vector))
+            new_particles.append(Particle(self.id, vector.get_array()))
         return new_particles
 
     @property
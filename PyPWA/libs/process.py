@@ -32,7 +32,10 @@ File Layout
 - Templates and Abstract Classes
 - Predefined Types
 - Process creation functions
+- Shared Memory
+- Chunk Scheduling
 - Process and Interface Objects
+- Persistent Process Pool
 
 
 .. note::
@@ -40,14 +43,45 @@ File Layout
     down from the returned interface object. This is done so that when
     new parameters are passed to the Duplex Processes there will not
     be an associated "startup" cost.
+
+.. note::
+    When use_shared_memory is set, arrays and ParticlePools are copied
+    into shared memory blocks once, and each kernel receives a view of
+    its slice of that block instead of a pickled copy. The blocks are
+    released when the interface object is stopped.
+
+.. note::
+    ProcessPool keeps its processes alive between jobs, the kernel and
+    interface can be swapped for each job while the data that was sent
+    to the processes stays resident.
+
+.. note::
+    Duplex processes can evaluate a Batch of arguments with a single
+    message through run_batch, each kernel returns one value for each
+    set of arguments in the batch.
+
+.. note::
+    When chunk_count is set, the data is cut into chunk_count chunks
+    instead of one slice per process, and the chunks are handed to
+    whichever process is free. The interface then receives one
+    communicator per chunk, and PROCESS_ID is set to the chunk's index
+    so that the results can still be stitched back into order. The
+    time of each chunk is recorded so that the slowest chunks are sent
+    out first on the following calls.
 """
 
 import copy
+import logging
+import time
 from abc import ABC, abstractmethod
+from concurrent import futures
+from dataclasses import dataclass
 from enum import Enum
 from multiprocessing import cpu_count, Pipe, Process
-from multiprocessing.connection import Connection
-from typing import Any, Dict, List, Tuple, Union
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional as Opt
+from typing import Tuple, Union
 
 import numpy as npy
 
@@ -57,7 +91,9 @@ from PyPWA.libs.math import vectors
 __credits__ = ["Mark Jones"]
 __author__ = _AUTHOR
 __version__ = _VERSION
-__all__ = ["make_processes", "ProcessCodes", "MAX_PROC"]
+__all__ = [
+    "make_processes", "ProcessPool", "Batch", "ProcessCodes", "MAX_PROC"
+]
 
 
 MAX_PROC = cpu_count()
@@ -107,6 +143,27 @@ class Kernel(ABC):
         """
         ...
 
+    def process_batch(self, batch: List[Any]) -> npy.ndarray:
+        """
+        Called with every set of arguments from a Batch at once. By
+        default this calls process once for each set, override this if
+        your calculation can be vectorized over the batch.
+
+        :param batch: The list of arguments that were sent in the Batch.
+        :return: An array with one value for each set of arguments.
+        """
+        return npy.array([self.process(values) for values in batch])
+
+
+@dataclass
+class Batch:
+    """
+    Wraps multiple sets of arguments so they can be sent to each kernel
+    with a single message, the kernel will answer with the value of
+    process_batch instead of process.
+    """
+    values: List[Any]
+
 
 class Interface(ABC):
 
@@ -122,6 +179,30 @@ class Interface(ABC):
         """
         ...
 
+    def run_batch(
+            self, communicator: List[Any], batch: List[Any]) -> npy.ndarray:
+        """
+        Evaluates every set of arguments in the batch with one round trip
+        to each kernel. By default the values returned from each kernel
+        are summed together, which is what is needed for likelihoods.
+        Override this if your kernels need to be reduced differently.
+
+        :param communicator: A list of objects that will be used to
+                             communicate with the kernels.
+        :param batch: The sets of arguments to evaluate.
+        :return: An array with one value for each set of arguments.
+        :raises RuntimeError: If any of the kernels failed.
+        """
+        for communication in communicator:
+            communication.send(Batch(list(batch)))
+
+        values = [communication.recv() for communication in communicator]
+        for value in values:
+            if isinstance(value, ProcessCodes):
+                raise RuntimeError("A kernel failed to process the batch!")
+
+        return npy.sum(values, axis=0)
+
 
 """
 Predefined Types
@@ -133,6 +214,8 @@ _pipe = Tuple[List[Connection], List[Connection]]
 _supported_types = Union[npy.ndarray, vectors.ParticlePool]
 _data = Dict[str, _supported_types]
 _data_packet = List[_data]
+_blocks = List[shared_memory.SharedMemory]
+_block_info = Tuple[str, npy.dtype, Tuple[int, ...]]
 
 
 """
@@ -143,17 +226,72 @@ Process creation functions
 def make_processes(
         data: _data, template_kernel: Kernel,
         interface: Interface, number_of_processes: int = MAX_PROC,
-        use_duplex: bool = True
+        use_duplex: bool = True, use_shared_memory: bool = False,
+        chunk_count: int = None
 ) -> "ProcessInterface":
+    """
+    Starts the processes with a copy of the kernel and their share of
+    the data.
+
+    :param data: Dictionary of arrays or ParticlePools, each is split
+        between the processes and set as an attribute of the kernels.
+    :param template_kernel: Kernel that is copied into each process.
+    :param interface: Interface that communicates with the kernels.
+    :param number_of_processes: How many processes to start.
+    :param use_duplex: Duplex processes stay alive and process every
+        value sent to them, simplex processes call process once and
+        send back the result.
+    :param use_shared_memory: Share the data through shared memory
+        instead of sending each process a pickled copy of its slice.
+    :param chunk_count: Cut the data into this many chunks and hand them
+        to whichever process is free. Chunked processes are always
+        duplex and always use shared memory, since any process can be
+        handed any chunk, so use_duplex and use_shared_memory are
+        ignored. Simplex interfaces that only receive still work, each
+        chunk's kernel is called with process(False) every time the
+        interface is run.
+    :return: The interface to run and stop the processes with.
+    """
+
+    if chunk_count:
+        return _make_chunked_processes(
+            data, template_kernel, interface, number_of_processes,
+            chunk_count
+        )
+
+    if use_shared_memory:
+        shared = _SharedData(data)
+        packets = shared.make_packets(number_of_processes)
+    else:
+        shared = None
+        packets = _make_data_packets(data, number_of_processes)
 
-    packets = _make_data_packets(data, number_of_processes)
     kernels = _create_kernels_containing_data(template_kernel, packets)
     processes, communication = _create_processes(kernels, use_duplex)
 
     for process in processes:
         process.start()
 
-    return ProcessInterface(interface, communication, processes)
+    return ProcessInterface(interface, communication, processes, shared)
+
+
+def _make_chunked_processes(
+        data: _data, template_kernel: Kernel, interface: Interface,
+        number_of_processes: int, chunk_count: int) -> "ProcessInterface":
+    # Every process can be handed any chunk, so they all need access
+    # to all of the data, which is only reasonable with shared memory.
+    shared = _SharedData(data)
+    packets = shared.make_packets(1) * number_of_processes
+    kernels = _create_kernels_containing_data(template_kernel, packets)
+    processes, communication = _create_processes(kernels, True)
+
+    for process in processes:
+        process.start()
+
+    scheduler = _ChunkScheduler(communication, chunk_count)
+    return ProcessInterface(
+        interface, communication, processes, shared, scheduler
+    )
 
 
 def _make_data_packets(data: _data, number_of_processes: int) -> _data_packet:
@@ -207,6 +345,302 @@ def _get_pipes_for_communication(num_of_pipes: int, is_duplex: bool) ->_pipe:
     return main, child
 
 
+"""
+Shared Memory
+"""
+
+
+def _get_bounds(length: int, count: int, index: int) -> Tuple[int, int]:
+    # Matches the slices produced by numpy.array_split
+    size, extra = divmod(length, count)
+    lower = index * size + min(index, extra)
+    return lower, lower + size + (1 if index < extra else 0)
+
+
+def _get_split_bounds(length: int, count: int) -> List[Tuple[int, int]]:
+    return [_get_bounds(length, count, index) for index in range(count)]
+
+
+def _get_length(data: _supported_types) -> int:
+    if isinstance(data, vectors.ParticlePool):
+        return data.event_count
+    return len(data)
+
+
+def _slice_data(
+        data: _supported_types, start: int, stop: int) -> _supported_types:
+    if isinstance(data, vectors.ParticlePool):
+        return vectors.ParticlePool([
+            vectors.Particle(p.id, p.get_array()[start:stop])
+            for p in data.iter_particles()
+        ])
+    return data[start:stop]
+
+
+class _SharedReference(ABC):
+
+    @abstractmethod
+    def attach(self) -> Tuple[_blocks, Any]:
+        """
+        Attaches to the shared memory from inside the process.
+
+        :return: The opened shared memory blocks, which must be kept
+            alive for as long as the data is used, and the data itself.
+        """
+        ...
+
+
+class _SharedArray(_SharedReference):
+
+    def __init__(
+            self, name: str, dtype: npy.dtype, shape: Tuple[int, ...],
+            start: int, stop: int):
+        self.__name = name
+        self.__dtype = dtype
+        self.__shape = shape
+        self.__start = start
+        self.__stop = stop
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.__name!r}, {self.__dtype!r},"
+            f" {self.__shape}, {self.__start}, {self.__stop})"
+        )
+
+    def attach(self) -> Tuple[_blocks, npy.ndarray]:
+        memory = shared_memory.SharedMemory(self.__name)
+        array = npy.ndarray(self.__shape, self.__dtype, memory.buf)
+        return [memory], array[self.__start:self.__stop]
+
+
+class _SharedParticles(_SharedReference):
+
+    def __init__(self, particles: List[Tuple[int, _SharedArray]]):
+        self.__particles = particles
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__particles!r})"
+
+    def attach(self) -> Tuple[_blocks, vectors.ParticlePool]:
+        memories, particles = [], []
+        for particle_id, reference in self.__particles:
+            memory, array = reference.attach()
+            memories.extend(memory)
+            particles.append(vectors.Particle(particle_id, array))
+        return memories, vectors.ParticlePool(particles)
+
+
+class _SharedData:
+
+    """Owns the shared memory blocks holding the data for the kernels
+
+    Each array is copied into its own block exactly once, after that
+    only the names and bounds of each slice are sent to the processes.
+    """
+
+    def __init__(self, data: _data):
+        self.__blocks: _blocks = []
+        self.__lengths: Dict[str, int] = dict()
+        self.__shared: Dict[str, Any] = dict()
+
+        for key, value in data.items():
+            if isinstance(value, npy.ndarray):
+                self.__shared[key] = self.__share_array(value)
+                self.__lengths[key] = len(value)
+            elif isinstance(value, vectors.ParticlePool):
+                self.__shared[key] = [
+                    (p.id, self.__share_array(p.get_array()))
+                    for p in value.iter_particles()
+                ]
+                self.__lengths[key] = value.event_count
+            else:
+                self.release()
+                raise ValueError(f"Unknown data {value!r}")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.__shared.keys())})"
+
+    def __share_array(self, array: npy.ndarray) -> _block_info:
+        if array.dtype.hasobject:
+            self.release()
+            raise ValueError("Object arrays can not be placed in memory!")
+
+        block = shared_memory.SharedMemory(
+            create=True, size=max(array.nbytes, 1)
+        )
+        self.__blocks.append(block)
+
+        shared = npy.ndarray(array.shape, array.dtype, block.buf)
+        shared[...] = array
+        del shared  # The block can't be closed while a view exists
+        return block.name, array.dtype, array.shape
+
+    def make_packets(self, number_of_processes: int) -> _data_packet:
+        list_of_dicts = [dict() for i in range(number_of_processes)]
+
+        for key, shared in self.__shared.items():
+            length = self.__lengths[key]
+            bounds = _get_split_bounds(length, number_of_processes)
+            for index, (start, stop) in enumerate(bounds):
+                if isinstance(shared, list):
+                    list_of_dicts[index][key] = _SharedParticles([
+                        (pid, _SharedArray(*array, start, stop))
+                        for pid, array in shared
+                    ])
+                else:
+                    list_of_dicts[index][key] = _SharedArray(
+                        *shared, start, stop
+                    )
+
+        return list_of_dicts
+
+    def release(self):
+        for block in self.__blocks:
+            block.close()
+            block.unlink()
+        self.__blocks = []
+
+
+"""
+Chunk Scheduling
+"""
+
+
+@dataclass
+class _Chunk:
+    """Asks a process to run its kernel against a single chunk"""
+    index: int
+    count: int
+    args: Any = False
+
+
+class _ChunkScheduler:
+
+    """Hands out chunks to whichever process is free
+
+    Each process is kept busy with up to _DEPTH chunks at a time so that
+    it never waits on the main process. The time each chunk took is
+    kept, and on the next call the slowest chunks are handed out first
+    so that the most expensive work doesn't end up at the tail.
+    """
+
+    _DEPTH = 2
+
+    def __init__(self, connections: List[Connection], chunk_count: int):
+        self.__connections = connections
+        self.__count = chunk_count
+        self.__times: List[Opt[float]] = [None] * chunk_count
+        self.__alive = list(range(len(connections)))
+        self.__assigned: Dict[int, List[int]] = dict()
+        self.__queue: List[int] = []
+        self.__args: Dict[int, Any] = dict()
+        self.__results: Dict[int, Any] = dict()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__count})"
+
+    @property
+    def communicators(self) -> List["_ChunkConnection"]:
+        return [_ChunkConnection(self, i) for i in range(self.__count)]
+
+    @property
+    def chunk_times(self) -> List[Opt[float]]:
+        return list(self.__times)
+
+    def send(self, index: int, args: Any):
+        if self.__is_running:
+            raise RuntimeError("Can't send while chunks are running!")
+        if not self.__args:
+            self.__results.clear()  # Start of a new call
+        self.__args[index] = args
+
+    def recv(self, index: int) -> Any:
+        if index not in self.__results and not self.__is_running:
+            self.__start()
+
+        while index not in self.__results:
+            self.__receive()
+        return self.__results.pop(index)
+
+    @property
+    def __is_running(self) -> bool:
+        return bool(self.__queue) or any(self.__assigned.values())
+
+    def __start(self):
+        self.__results.clear()
+
+        # Chunks without a time yet are sent first, then slowest first
+        times = [npy.inf if t is None else t for t in self.__times]
+        self.__queue = sorted(
+            range(self.__count), key=lambda i: times[i], reverse=True
+        )
+        self.__assigned = {worker: [] for worker in self.__alive}
+
+        for depth in range(self._DEPTH):
+            for worker in self.__alive:
+                self.__dispatch(worker)
+
+        self.__fail_unassigned()
+
+    def __dispatch(self, worker: int):
+        if self.__queue:
+            index = self.__queue.pop(0)
+            args = self.__args.get(index, False)
+            self.__connections[worker].send(_Chunk(index, self.__count, args))
+            self.__assigned[worker].append(index)
+
+        if not self.__queue:
+            self.__args = dict()
+
+    def __receive(self):
+        busy = [w for w in self.__alive if self.__assigned[w]]
+        ready = wait([self.__connections[w] for w in busy])
+
+        for worker in busy:
+            if self.__connections[worker] in ready:
+                self.__handle(worker, self.__connections[worker].recv())
+
+    def __handle(self, worker: int, received: Any):
+        if isinstance(received, ProcessCodes):
+            # The process has died, everything it held is lost
+            self.__alive.remove(worker)
+            for index in self.__assigned.pop(worker):
+                self.__results[index] = received
+            self.__fail_unassigned()
+        else:
+            index, value, elapsed = received
+            self.__assigned[worker].remove(index)
+            self.__results[index] = value
+            self.__times[index] = elapsed
+            self.__dispatch(worker)
+
+    def __fail_unassigned(self):
+        if not self.__alive:
+            for index in self.__queue:
+                self.__results[index] = ProcessCodes.ERROR
+            self.__queue = []
+            self.__args = dict()
+
+
+class _ChunkConnection:
+
+    """Stands in for a connection, but for a chunk instead of a process"""
+
+    def __init__(self, scheduler: _ChunkScheduler, index: int):
+        self.__scheduler = scheduler
+        self.__index = index
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}"
+                f"({self.__scheduler!r}, {self.__index})")
+
+    def send(self, args: Any):
+        self.__scheduler.send(self.__index, args)
+
+    def recv(self) -> Any:
+        return self.__scheduler.recv(self.__index)
+
+
 """
 Process and Interface Objects
 """
@@ -223,13 +657,42 @@ class ProcessInterface:
     def __init__(self,
                  interface_kernel: Interface,
                  process_com: List[Connection],
-                 processes: List["_SmartProcess"]):
+                 processes: List["_SmartProcess"],
+                 shared: Opt[_SharedData] = None,
+                 scheduler: Opt[_ChunkScheduler] = None):
         self.__connections = process_com
         self.__interface = interface_kernel
         self.__processes = processes
+        self.__shared = shared
+        self.__scheduler = scheduler
+
+        if scheduler:
+            self.__communicators = scheduler.communicators
+        else:
+            self.__communicators = process_com
 
     def run(self, *args):
-        return self.__interface.run(self.__connections, args)
+        return self.__interface.run(self.__communicators, args)
+
+    def run_batch(self, batch: List[Any]) -> npy.ndarray:
+        """
+        Evaluates a list of arguments with a single message to each of
+        the duplex processes.
+
+        :raises RuntimeError: If the processes are simplex, since they
+            can't be sent anything.
+        """
+        if not self.__connections[0].writable:
+            raise RuntimeError("Batches can only be run on duplex processes!")
+        return self.__interface.run_batch(self.__communicators, batch)
+
+    @property
+    def chunk_times(self) -> List[Opt[float]]:
+        """
+        The last recorded time of each chunk, in seconds, or an empty
+        list if the data wasn't split into chunks.
+        """
+        return self.__scheduler.chunk_times if self.__scheduler else []
 
     def stop(self, force: bool = False):
         if self.__connections[0].writable and not force:
@@ -237,6 +700,10 @@ class ProcessInterface:
         else:
             self.__terminate_processes()
 
+        # The processes keep their own mapping, so it's safe to unlink
+        if self.__shared:
+            self.__shared.release()
+
     def __ask_processes_to_stop(self):
         for connection in self.__connections:
             connection.send(ProcessCodes.SHUTDOWN)
@@ -250,20 +717,43 @@ class ProcessInterface:
         return True in [proc.is_alive() for proc in self.__processes]
 
 
+def _call_kernel(kernel: Kernel, received_data: Any) -> Any:
+    if isinstance(received_data, Batch):
+        return kernel.process_batch(received_data.values)
+    return kernel.process(received_data)
+
+
 class _SmartProcess(Process):
 
     def __init__(self, kernel: Kernel, connect: Connection):
         super(Process, self).__init__()
         self.__kernel = kernel
         self.__connection = connect
+        self.__memory: _blocks = []
+        self.__resident: _data = dict()
         self.daemon = True
 
     def run(self):
+        try:
+            self.__attach_shared_memory()
+        except Exception:
+            self.__connection.send(ProcessCodes.ERROR)
+            raise
+
         if self.__connection.readable:
             self.__run_duplex()
         else:
             self.__run_simplex()
 
+    def __attach_shared_memory(self):
+        # The blocks must stay referenced for as long as the views exist
+        for key, value in list(vars(self.__kernel).items()):
+            if isinstance(value, _SharedReference):
+                memory, data = value.attach()
+                self.__memory.extend(memory)
+                self.__resident[key] = data
+                setattr(self.__kernel, key, data)
+
     def __run_duplex(self):
         try:
             self.__kernel.setup()
@@ -276,19 +766,32 @@ class _SmartProcess(Process):
     def __loop(self):
         while True:
             received = self.__connection.recv()
-            if received == ProcessCodes.SHUTDOWN:
+            if isinstance(received, ProcessCodes):
                 break
             self.__process(received)
 
     def __process(self, received_data):
         try:
-            value = self.__kernel.process(received_data)
+            if isinstance(received_data, _Chunk):
+                value = self.__process_chunk(received_data)
+            else:
+                value = _call_kernel(self.__kernel, received_data)
         except Exception:
             self.__connection.send(ProcessCodes.ERROR)
             raise
         else:
             self.__connection.send(value)
 
+    def __process_chunk(self, chunk: _Chunk) -> Tuple[int, Any, float]:
+        for key, value in self.__resident.items():
+            bounds = _get_bounds(_get_length(value), chunk.count, chunk.index)
+            setattr(self.__kernel, key, _slice_data(value, *bounds))
+
+        self.__kernel.PROCESS_ID = chunk.index
+        start = time.perf_counter()
+        value = _call_kernel(self.__kernel, chunk.args)
+        return chunk.index, value, time.perf_counter() - start
+
     def __run_simplex(self):
         try:
             self.__kernel.setup()
@@ -296,3 +799,226 @@ class _SmartProcess(Process):
         except Exception:
             self.__connection.send(ProcessCodes.ERROR)
             raise
+
+
+"""
+Persistent Process Pool
+"""
+
+
+@dataclass
+class _KernelPackage:
+    """
+    Sent to the pool's processes to swap the kernel. If data is None
+    the data that is already resident in the process is kept.
+    """
+    kernel: Kernel
+    data: Opt[_data] = None
+
+
+class ProcessPool:
+
+    """Processes that are kept alive and reused between jobs
+
+    The processes are started once, after that each call to load will
+    swap the kernel and interface, and optionally the data, while
+    keeping the processes warm. Jobs are executed in the order they
+    were submitted.
+
+    Example:
+        pool = ProcessPool(4)
+        pool.load(kernel, interface, {"data": data})
+        first = pool.run(parameters)
+        rest = list(pool.map(list_of_parameters))
+        pool.stop()
+    """
+
+    def __init__(
+            self, number_of_processes: int = MAX_PROC,
+            use_shared_memory: bool = False):
+        self.__args = (number_of_processes, use_shared_memory)
+        self.__interface: Interface = None
+        self.__shared: Opt[_SharedData] = None
+        self.__executor = futures.ThreadPoolExecutor(1)
+
+        # Processes must share the tracker, otherwise each would start
+        # its own and unlink the blocks it attached to when it exits.
+        if use_shared_memory:
+            resource_tracker.ensure_running()
+
+        self.__connections, children = _get_pipes_for_communication(
+            number_of_processes, True
+        )
+
+        self.__processes = []
+        for index, connection in enumerate(children):
+            self.__processes.append(_PoolProcess(index, connection))
+            self.__processes[-1].start()
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}"
+                f"({self.__args[0]}, {self.__args[1]})")
+
+    def load(self, kernel: Kernel, interface: Interface, data: _data = None):
+        """
+        Swaps the kernel and interface used by the pool, the setup of
+        the new kernel is called once in each process.
+
+        :param kernel: The template kernel, a copy is sent to each
+            process, so it must be picklable.
+        :param interface: The interface used for every following job.
+        :param data: New data to split between the processes, if omitted
+            the data from the previous load is given to the new kernel.
+        :raises RuntimeError: If the setup of any kernel failed.
+        """
+        self.__executor.submit(self.__load, kernel, interface, data).result()
+
+    def __load(self, kernel: Kernel, interface: Interface, data: _data):
+        previous_shared = self.__shared
+        packets = self.__make_packets(data)
+
+        for connection, packet in zip(self.__connections, packets):
+            connection.send(_KernelPackage(kernel, packet))
+
+        results = [connection.recv() for connection in self.__connections]
+
+        # Each process has attached its own mapping by now
+        if data is not None and previous_shared:
+            previous_shared.release()
+
+        if ProcessCodes.ERROR in results:
+            self.__interface = None
+            raise RuntimeError("Kernel failed to setup in the pool!")
+        self.__interface = interface
+
+    def __make_packets(self, data: Opt[_data]) -> List[Opt[_data]]:
+        if data is None:
+            return [None] * len(self.__connections)
+        elif self.__args[1]:
+            self.__shared = _SharedData(data)
+            return self.__shared.make_packets(len(self.__connections))
+        else:
+            return _make_data_packets(data, len(self.__connections))
+
+    def run(self, *args) -> Any:
+        return self.submit(*args).result()
+
+    def submit(self, *args) -> futures.Future:
+        """
+        Queues a job with the currently loaded kernel and interface.
+
+        :return: A future that will hold the value from the interface.
+        """
+        return self.__executor.submit(self.__run, args)
+
+    def run_batch(self, batch: List[Any]) -> npy.ndarray:
+        return self.submit_batch(batch).result()
+
+    def submit_batch(self, batch: List[Any]) -> futures.Future:
+        """
+        Queues a batch of arguments, each kernel evaluates the whole
+        batch from a single message.
+
+        :return: A future that will hold the array from the interface.
+        """
+        return self.__executor.submit(self.__run_batch, batch)
+
+    def __run_batch(self, batch: List[Any]) -> npy.ndarray:
+        if not self.__interface:
+            raise RuntimeError("No kernel has been loaded into the pool!")
+        return self.__interface.run_batch(self.__connections, batch)
+
+    def map(self, *iterables: Iterable[Any]) -> Iterator[Any]:
+        """
+        Runs the loaded kernels once for each set of arguments, in the
+        same manner as the builtin map.
+        """
+        jobs = [self.submit(*args) for args in zip(*iterables)]
+        return (job.result() for job in jobs)
+
+    def __run(self, args: Tuple[Any]) -> Any:
+        if not self.__interface:
+            raise RuntimeError("No kernel has been loaded into the pool!")
+        return self.__interface.run(self.__connections, args)
+
+    def stop(self, force: bool = False):
+        self.__executor.shutdown()
+
+        if force:
+            for process in self.__processes:
+                process.terminate()
+        else:
+            for connection in self.__connections:
+                connection.send(ProcessCodes.SHUTDOWN)
+
+        if self.__shared:
+            self.__shared.release()
+            self.__shared = None
+
+    @property
+    def is_alive(self) -> bool:
+        return True in [proc.is_alive() for proc in self.__processes]
+
+
+class _PoolProcess(Process):
+
+    __LOGGER = logging.getLogger(__name__ + "._PoolProcess")
+
+    def __init__(self, index: int, connect: Connection):
+        super(Process, self).__init__()
+        self.__index = index
+        self.__connection = connect
+        self.__kernel: Kernel = None
+        self.__data: _data = dict()
+        self.__memory: _blocks = []
+        self.daemon = True
+
+    def run(self):
+        while True:
+            received = self.__connection.recv()
+            if isinstance(received, ProcessCodes):
+                break
+            elif isinstance(received, _KernelPackage):
+                self.__load(received)
+            else:
+                self.__process(received)
+
+    def __load(self, package: _KernelPackage):
+        self.__kernel = None
+        try:
+            if package.data is not None:
+                self.__replace_data(package.data)
+
+            package.kernel.PROCESS_ID = self.__index
+            for key, value in self.__data.items():
+                setattr(package.kernel, key, value)
+
+            package.kernel.setup()
+        except Exception:
+            self.__LOGGER.exception("Failed to load kernel")
+            self.__connection.send(ProcessCodes.ERROR)
+        else:
+            self.__kernel = package.kernel
+            self.__connection.send(True)
+
+    def __replace_data(self, data: _data):
+        # Views have to be dropped before their blocks can be closed
+        self.__data = dict()
+        for memory in self.__memory:
+            memory.close()
+        self.__memory = []
+
+        for key, value in data.items():
+            if isinstance(value, _SharedReference):
+                memory, value = value.attach()
+                self.__memory.extend(memory)
+            self.__data[key] = value
+
+    def __process(self, received_data: Any):
+        try:
+            value = _call_kernel(self.__kernel, received_data)
+        except Exception:
+            self.__LOGGER.exception("Kernel failed to process")
+            self.__connection.send(ProcessCodes.ERROR)
+        else:
+            self.__connection.send(value)
@@ -20,22 +20,36 @@
 Defines how the simulation works for PyPWA
 """
 
-import secrets
-from typing import Any, Callable, Dict, List, Union
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional as Opt, Tuple, Union
 
 import numpy as npy
 
-from PyPWA.libs.file import slot_table
+from PyPWA.libs.file import misc, slot_table
 from PyPWA.libs import process
 import multiprocessing
 
 
+_SEED = Opt[Union[int, npy.random.SeedSequence]]
+_CHUNK_SIZE = 5000
+_LOGGER = logging.getLogger(__name__)
+
+
 def calculate_intensities(
         function: Callable[[Any, Any], npy.ndarray],
         setup: Callable[[], None],
         params: Dict[str, float],
-        data: Union[npy.ndarray, slot_table.DataSlot],
-        processes: int = multiprocessing.cpu_count()
+        data: Opt[Union[npy.ndarray, slot_table.DataSlot]],
+        processes: int = multiprocessing.cpu_count(),
+        pool: process.ProcessPool = None,
+        seed: _SEED = None,
+        chunk_size: int = _CHUNK_SIZE,
+        streaming: bool = False,
+        spill_directory: Path = None,
+        columns: List[str] = None
 ) -> npy.ndarray:
     """Calculates the rejection list
     This takes a user defined intensity function along with it's
@@ -47,36 +61,84 @@ def calculate_intensities(
         if needed.
     :param params: Dictionary of the parameters and their associated
         values. These are the values for the intensity to simulate with.
-    :param data: The data to simulate against
+    :param data: The data to simulate against. When a pool is used,
+        None reuses the data from the pool's last load, so repeated
+        simulations against the same data don't send it again.
     :param processes: How many processes to execute with if applicable
+    :param pool: A running process pool to reuse for in memory data
+        instead of starting new processes. The data is sent to the
+        pool on every call unless data is None.
+    :param seed: Seed for the rejection, the same seed will always
+        produce the same rejection list for the same intensities.
+    :param chunk_size: How many rows are read from a table at a time.
+    :param streaming: Only used for tables. The intensities are spilled
+        to disk while the max intensity is tracked, then read back in
+        chunks for the rejection, so neither the intensities or the
+        data ever need to fit in memory. The rejection list is returned
+        as a memory mapped array.
+    :param spill_directory: Where the intensities are spilled to when
+        streaming, defaults to the cache directory.
+    :param columns: If set, only these columns are sent to the processes
+        or read from the table and passed to the intensity function.
     :return: A pass/fail boolean array of the same length as data
     """
 
-    if isinstance(data, npy.ndarray):
+    if streaming and isinstance(data, slot_table.DataSlot):
+        return _streaming_rejection(
+            setup, function, data, params, processes,
+            seed, chunk_size, spill_directory, columns
+        )
+
+    if data is None and pool:
+        intensity = _in_memory_intensities(
+            setup, function, None, params, processes, pool
+        )
+    elif isinstance(data, npy.ndarray):
+        if columns:
+            data = misc.select_columns(data, columns)
         intensity = _in_memory_intensities(
-            setup, function, data, params, processes
+            setup, function, data, params, processes, pool
+        )
+    elif isinstance(data, slot_table.DataSlot) and data.is_read_only:
+        intensity = _parallel_table_intensities(
+            setup, function, data, params, processes, chunk_size, columns
         )
     elif isinstance(data, slot_table.DataSlot):
-        intensity = _in_table_intensities(setup, function, data, params)
+        _LOGGER.info(
+            "Table is open for writing, processes can't open it as well, "
+            "falling back to a single process."
+        )
+        intensity = _in_table_intensities(
+            setup, function, data, params, chunk_size, columns
+        )
     else:
         raise ValueError("Unknown data type!")
 
-    return _make_reject_list(intensity)
+    return make_rejection_list(intensity, seed=seed)
 
 
 def _in_memory_intensities(
         setup_function: Callable[[], None],
         processing_function: Callable[[Any, Any], npy.ndarray],
-        data: npy.ndarray,
+        data: Opt[npy.ndarray],
         params: Dict[str, float],
-        processes: int) -> npy.ndarray:
+        processes: int,
+        pool: process.ProcessPool = None) -> npy.ndarray:
 
     kernel = _Kernel(setup_function, processing_function, params)
-    interface = _Interface()
+
+    if pool:
+        # Without data the pool hands its loaded data to the new kernel
+        packet = None if data is None else {"data": data}
+        pool.load(kernel, _Interface(True), packet)
+        return pool.run()
+
     manager = process.make_processes(
-        {"data": data}, kernel, interface, processes, False
+        {"data": data}, kernel, _Interface(), processes, False
     )
-    return manager.run()
+    intensities = manager.run()
+    manager.stop()
+    return intensities
 
 
 class _Kernel(process.Kernel):
@@ -100,9 +162,15 @@ class _Kernel(process.Kernel):
 
 
 class _Interface(process.Interface):
-    IS_DUPLEX = False
+
+    def __init__(self, is_duplex: bool = False):
+        self.__is_duplex = is_duplex
 
     def run(self, communicator: List[Any], args: Any) -> npy.ndarray:
+        if self.__is_duplex:
+            for communication in communicator:
+                communication.send(True)
+
         data = self.__receive_data(communicator)
         return npy.concatenate(data)
 
@@ -119,20 +187,270 @@ def _in_table_intensities(
         setup_function: Callable[[], None],
         processing_function: Callable[[Any, Any], Any],
         data: slot_table.DataSlot,
-        parameters: Dict[str, float]) -> npy.ndarray:
+        parameters: Dict[str, float],
+        chunk_size: int = _CHUNK_SIZE,
+        columns: List[str] = None) -> npy.ndarray:
 
     setup_function()
 
     chunk_collection = []
-    for index, chunk in enumerate(slot_table.iter_root(data.get_root())):
+    root = data.get_root()
+    for chunk in slot_table.iter_root(root, chunk_size, columns):
         chunk_collection.append(processing_function(chunk, parameters))
 
     return npy.concatenate(chunk_collection)
 
 
-def _make_reject_list(intensities: npy.ndarray) -> npy.ndarray:
-    rejection_list = npy.zeros(len(intensities), bool)
-    for index, event in enumerate(intensities / intensities.max()):
-        if event > secrets.SystemRandom().random():
-            rejection_list[index] = True
+def _parallel_table_intensities(
+        setup_function: Callable[[], None],
+        processing_function: Callable[[Any, Any], Any],
+        data: slot_table.DataSlot,
+        parameters: Dict[str, float],
+        processes: int,
+        chunk_size: int,
+        columns: List[str] = None) -> npy.ndarray:
+
+    # Each chunk of rows is scheduled separately, so slow chunks don't
+    # hold up the other processes.
+    starts = npy.arange(0, len(data), chunk_size)
+    if not len(starts):
+        return npy.empty(0)
+
+    kernel = _TableKernel(
+        setup_function, processing_function, parameters,
+        data.file_name, data.group_name, chunk_size, columns=columns
+    )
+    manager = process.make_processes(
+        {"chunks": starts}, kernel, _Interface(), processes, False,
+        chunk_count=len(starts)
+    )
+    intensities = manager.run()
+    manager.stop()
+    return intensities
+
+
+class _TableKernel(process.Kernel):
+
+    """Opens the table inside the process and reads its own rows
+
+    Only the start of each chunk is sent to the process, the rows are
+    read from the HDF5 file directly by the process. If a spill file is
+    provided the intensities are written into it instead, and only the
+    max intensity of each chunk is returned. If columns are provided,
+    only those columns are read from the table.
+    """
+
+    def __init__(
+            self,
+            setup_function: Callable[[], None],
+            processing_function: Callable[[Any, Any], npy.ndarray],
+            parameters: Dict[str, float],
+            file_name: str,
+            slot_name: str,
+            chunk_size: int,
+            spill_name: str = None,
+            columns: List[str] = None):
+        self.__setup_function = setup_function
+        self.__processing_function = processing_function
+        self.__parameters = parameters
+        self.__file_name = file_name
+        self.__slot_name = slot_name
+        self.__chunk_size = chunk_size
+        self.__spill_name = spill_name
+        self.__columns = columns
+        self.__table: slot_table.SlotFactory = None
+        self.__spill: npy.ndarray = None
+        self.chunks: npy.ndarray = None
+
+    def setup(self):
+        self.__table = slot_table.SlotFactory(self.__file_name, "r")
+        if self.__spill_name:
+            self.__spill = npy.lib.format.open_memmap(
+                self.__spill_name, "r+"
+            )
+        self.__setup_function()
+
+    def process(self, data: Any = False) -> Any:
+        root = self.__table.get_slot(self.__slot_name).get_root()
+
+        calculated = []
+        for start in self.chunks:
+            stop = start + self.__chunk_size
+            if self.__columns:
+                chunk = slot_table.read_columns(
+                    root, self.__columns, start, stop
+                )
+            else:
+                chunk = root.read(start, stop)
+            calculated.append(
+                self.__processing_function(chunk, self.__parameters)
+            )
+
+        if self.__spill is None:
+            return self.PROCESS_ID, npy.concatenate(calculated)
+
+        for start, intensities in zip(self.chunks, calculated):
+            self.__spill[start:start + len(intensities)] = intensities
+        self.__spill.flush()
+        maxes = npy.array([intensities.max() for intensities in calculated])
+        return self.PROCESS_ID, maxes
+
+
+def _streaming_rejection(
+        setup_function: Callable[[], None],
+        processing_function: Callable[[Any, Any], Any],
+        data: slot_table.DataSlot,
+        parameters: Dict[str, float],
+        processes: int,
+        seed: _SEED,
+        chunk_size: int,
+        spill_directory: Opt[Path],
+        columns: Opt[List[str]]) -> npy.ndarray:
+
+    if not len(data):
+        return npy.empty(0, bool)
+
+    directory = spill_directory if spill_directory else misc.get_cache_uri()
+    with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".npy", delete=False) as stream:
+        spill_name = stream.name
+
+    try:
+        # First pass spills the intensities and finds the max intensity
+        spilled = npy.lib.format.open_memmap(
+            spill_name, "w+", npy.float64, (len(data),)
+        )
+
+        if data.is_read_only:
+            max_intensity = _parallel_spill_intensities(
+                setup_function, processing_function, data, parameters,
+                processes, chunk_size, spill_name, columns
+            )
+        else:
+            max_intensity = _spill_intensities(
+                setup_function, processing_function, data, parameters,
+                chunk_size, spilled, columns
+            )
+
+        # Second pass streams the intensities back in for the rejection,
+        # the memmap keeps its own mapping after the file is closed.
+        with tempfile.TemporaryFile(dir=directory) as stream:
+            rejection = npy.memmap(stream, bool, "w+", shape=(len(data),))
+        make_rejection_list(
+            spilled, max_intensity, seed, chunk_size, out=rejection
+        )
+        rejection.flush()
+        return rejection
+    finally:
+        spilled = None
+        os.remove(spill_name)
+
+
+def _spill_intensities(
+        setup_function: Callable[[], None],
+        processing_function: Callable[[Any, Any], Any],
+        data: slot_table.DataSlot,
+        parameters: Dict[str, float],
+        chunk_size: int,
+        spill: npy.ndarray,
+        columns: List[str] = None) -> float:
+
+    setup_function()
+
+    lower, max_intensity = 0, -npy.inf
+    root = data.get_root()
+    for chunk in slot_table.iter_root(root, chunk_size, columns):
+        calculated = processing_function(chunk, parameters)
+        spill[lower:lower + len(calculated)] = calculated
+        max_intensity = max(max_intensity, calculated.max())
+        lower += len(calculated)
+
+    spill.flush()
+    return max_intensity
+
+
+def _parallel_spill_intensities(
+        setup_function: Callable[[], None],
+        processing_function: Callable[[Any, Any], Any],
+        data: slot_table.DataSlot,
+        parameters: Dict[str, float],
+        processes: int,
+        chunk_size: int,
+        spill_name: str,
+        columns: List[str] = None) -> float:
+
+    starts = npy.arange(0, len(data), chunk_size)
+    kernel = _TableKernel(
+        setup_function, processing_function, parameters,
+        data.file_name, data.group_name, chunk_size, spill_name, columns
+    )
+    manager = process.make_processes(
+        {"chunks": starts}, kernel, _Interface(), processes, False,
+        chunk_count=len(starts)
+    )
+    max_intensities = manager.run()
+    manager.stop()
+    return max_intensities.max()
+
+
+def get_generators(seed: _SEED, count: int) -> List[npy.random.Generator]:
+    """
+    Creates independent random streams from a single seed, so that
+    each worker can have its own stream while the results stay
+    reproducible.
+    """
+    if not isinstance(seed, npy.random.SeedSequence):
+        seed = npy.random.SeedSequence(seed)
+    return [npy.random.default_rng(child) for child in seed.spawn(count)]
+
+
+def make_rejection_list(
+        intensities: npy.ndarray,
+        max_intensity: float = None,
+        seed: Union[_SEED, npy.random.Generator] = None,
+        chunk_size: int = None,
+        return_weights: bool = False,
+        out: npy.ndarray = None
+) -> Union[npy.ndarray, Tuple[npy.ndarray, npy.ndarray]]:
+    """Rejection method over the intensities
+
+    Each event passes if its intensity divided by the max intensity is
+    larger than a uniform random number.
+
+    :param intensities: The intensity of each event
+    :param max_intensity: The value to normalize by, defaults to the
+        max of the intensities. Must be provided if the intensities are
+        only a part of the full set.
+    :param seed: Seed or generator for the random numbers
+    :param chunk_size: If provided, the random numbers are generated this
+        many at a time to bound the extra memory. The result is identical
+        to the result without chunks.
+    :param return_weights: If True the normalized intensities are
+        returned along with the pass/fail array.
+    :param out: Array to write the pass/fail values into, such as a
+        memory mapped array, instead of a new array.
+    :return: The pass/fail boolean array, and optionally the weights.
+    """
+    if isinstance(seed, npy.random.Generator):
+        generator = seed
+    else:
+        generator = npy.random.default_rng(seed)
+
+    if max_intensity is None:
+        max_intensity = intensities.max()
+
+    length = len(intensities)
+    chunk_size = chunk_size if chunk_size else max(length, 1)
+    weights = npy.empty(length) if return_weights else None
+    rejection_list = npy.empty(length, bool) if out is None else out
+
+    for lower in range(0, length, chunk_size):
+        upper = lower + chunk_size
+        weight = intensities[lower:upper] / max_intensity
+        rejection_list[lower:upper] = weight > generator.random(len(weight))
+        if return_weights:
+            weights[lower:upper] = weight
+
+    if return_weights:
+        return rejection_list, weights
     return rejection_list
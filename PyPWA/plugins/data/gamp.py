@@ -27,10 +27,15 @@ will not be saved in memory by these object.
 - GampMemory: Loads GAMP Data into memory to bypass the disk bottleneck with
     calculations. DO NOT USE THIS FOR LARGE GAMP FILES! THIS OBJECT WILL
     QUICKLY OVERFILL THE MEMORY OF YOUR PC, EVEN WITH THE NUMPY OPTIMIZATIONS!
+    The file is read in large blocks and every value in a block is
+    converted at once, instead of splitting each line in Python.
 """
 
+import itertools
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional as Opt
+
+import numpy as npy
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.file import misc
@@ -43,6 +48,10 @@ __version__ = VERSION
 
 
 _COUNT = 3  # number of events to check
+_BLOCK_SIZE = 2 ** 24  # bytes read at a time by the bulk parser
+_COLUMNS = 6  # id, charge, x, y, z, e
+_BUFFER = 2 ** 20  # Size of the write buffer
+_CHUNK_SIZE = 50000  # Events formatted at a time
 
 
 class _GampDataPlugin(templates.IDataPlugin):
@@ -84,6 +93,14 @@ class _GampDataTest(templates.IReadTest):
         return "{0}()".format(self.__class__.__name__)
 
     def can_read(self, filename):
+        # type: (Path) -> bool
+        try:
+            return self.__test_events(filename)
+        except UnicodeDecodeError:  # Binary files, such as .npy
+            return False
+
+    @staticmethod
+    def __test_events(filename):
         # type: (Path) -> bool
         with filename.open() as stream:
             for i in range(_COUNT):
@@ -105,7 +122,8 @@ class _GampDataTest(templates.IReadTest):
 
 
 def _get_particle_pool(
-        filename: Path, particle_length: int = 1) -> vectors.ParticlePool:
+        filename: Path, particle_length: int = 1,
+        precision: npy.floating = npy.float64) -> vectors.ParticlePool:
     with filename.open() as stream:
         count = int(stream.readline())
         lines = [stream.readline() for i in range(count)]
@@ -113,10 +131,66 @@ def _get_particle_pool(
     events = []
     for line in lines:
         p_id, charge, x, y, z, e = line.strip("\n").split(" ")
-        events.append(vectors.Particle(int(p_id), particle_length))
+        events.append(
+            vectors.Particle(int(p_id), particle_length, precision=precision)
+        )
     return vectors.ParticlePool(events)
 
 
+def _iter_event_blocks(
+        filename: Path, particle_count: int) -> Iterator[npy.ndarray]:
+    """Yields every value of whole events as a 2D array
+
+    Each row is an event, starting with the particle count followed by
+    the six columns of each particle. Blocks are cut on the last newline
+    so that no value is split between blocks, and any values left over
+    from a partial event are carried into the next block.
+    """
+    width = 1 + _COLUMNS * particle_count
+    leftover, remainder = npy.empty(0), b""
+
+    with filename.open("rb") as stream:
+        while True:
+            block = stream.read(_BLOCK_SIZE)
+            text = remainder + block
+            if block:
+                cut = text.rfind(b"\n") + 1
+                text, remainder = text[:cut], text[cut:]
+
+            # fromstring returns [-1] for only whitespace
+            if text.strip():
+                values = npy.concatenate(
+                    [leftover, npy.fromstring(text, sep=" ")]
+                )
+            else:
+                values = leftover
+            whole = len(values) - len(values) % width
+            if whole:
+                yield values[:whole].reshape(-1, width)
+            leftover = values[whole:]
+
+            if not block:
+                break
+
+    if len(leftover):
+        raise ValueError(f"{filename} ends with an incomplete event!")
+
+
+def _fill_particles(
+        arrays: List[npy.ndarray], events: npy.ndarray, index: int = 0):
+    particle_count = len(arrays)
+    if (events[:, 0] != particle_count).any():
+        raise ValueError(
+            f"Every event must have {particle_count} particles!"
+        )
+
+    end = index + len(events)
+    for pi, array in enumerate(arrays):
+        first = 3 + _COLUMNS * pi  # Skips count, id, and charge
+        for ci, name in enumerate(("x", "y", "z", "e")):
+            array[name][index:end] = events[:, first + ci]
+
+
 class _GampReader(templates.ReaderBase):
 
     def __init__(self, filename: Path):
@@ -135,6 +209,25 @@ class _GampReader(templates.ReaderBase):
         self.__update_particle_pool()
         return self.__particle_pool
 
+    def read_chunk(self, size: int) -> vectors.ParticlePool:
+        particle_count = self.__particle_pool.particle_count
+        lines = list(itertools.takewhile(
+            lambda line: line.strip(),
+            itertools.islice(self.__file_handle, size * (particle_count + 1))
+        ))
+        if not lines:
+            raise StopIteration
+
+        events = npy.fromstring("".join(lines), sep=" ")
+        events = events.reshape(-1, 1 + _COLUMNS * particle_count)
+
+        chunk = vectors.ParticlePool([
+            vectors.Particle(p.id, len(events))
+            for p in self.__particle_pool.iter_particles()
+        ])
+        _fill_particles([p.get_array() for p in chunk.stored], events)
+        return chunk
+
     def __update_particle_pool(self):
         for p in self.__particle_pool.iter_particles():
             line = self.__file_handle.readline()
@@ -168,40 +261,81 @@ class _GampWriter(templates.WriterBase):
 
     def __init__(self, filename: Path):
         self.__filename = filename
-        self.__file_handle = filename.open("w")
+        self.__file_handle = filename.open("w", buffering=_BUFFER)
+        self.__event_format: str = None
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.__filename})"
 
     def write(self, data: vectors.ParticlePool):
-        # I like f-strings, but this is the fastest way to make a string
-        self.__file_handle.write("%i\n" % data.particle_count)
+        self.write_chunk(data)
+
+    def write_chunk(self, data: vectors.ParticlePool):
+        if not self.__event_format:
+            self.__event_format = self.__get_event_format(data)
+
+        arrays = [p.get_array() for p in data.iter_particles()]
+        for start in range(0, data.event_count, _CHUNK_SIZE):
+            self.__write_events(arrays, start, start + _CHUNK_SIZE)
+
+    def __write_events(self, arrays: List[npy.ndarray], start: int, end: int):
+        values = npy.empty((len(arrays[0][start:end]), 4 * len(arrays)))
+        for pi, array in enumerate(arrays):
+            for ci, name in enumerate(("x", "y", "z", "e")):
+                values[:, 4 * pi + ci] = array[name][start:end]
+
+        event_format = self.__event_format
+        self.__file_handle.write(
+            "".join([event_format % tuple(row) for row in values.tolist()])
+        )
+
+    @staticmethod
+    def __get_event_format(data: vectors.ParticlePool) -> str:
+        # The id and charge are the same for every event
+        event_format = "%i\n" % data.particle_count
         for p in data.iter_particles():
-            self.__file_handle.write(
-                "%d %d %.20f %.20f %.20f %.20f\n" % (
-                    p.id, p.charge, p.x[0], p.y[0], p.z[0], p.e[0]
-                )
-            )
+            event_format += "%d %d " % (p.id, p.charge)
+            event_format += "%.20f %.20f %.20f %.20f\n"
+        return event_format
 
     def close(self):
         self.__file_handle.close()
 
 
-class _GampMemory(templates.IMemory):
+class _GampMemory(templates.IMemory, templates.IColumnMemory):
 
     def __repr__(self) -> str:
         return "GampMemory()"
 
     def parse(self, filename: Path) -> vectors.ParticlePool:
+        return self.parse_columns(filename, None)
+
+    def parse_columns(
+            self, filename: Path, columns: Opt[List[str]],
+            precision: npy.floating = None) -> vectors.ParticlePool:
+        if columns:
+            raise ValueError("GAMP files can not be loaded by column!")
+
         with _GampReader(filename) as reader:
-            empty_pool = _get_particle_pool(filename, len(reader))
-            for ei, e in enumerate(reader):
-                for pi, p in enumerate(e.iter_particles()):
-                    # You must use get array to get a reference and not a copy
-                    empty_pool.stored[pi].get_array()[ei] = p.get_array()
+            event_count = len(reader)
+
+        empty_pool = _get_particle_pool(
+            filename, event_count, precision or npy.float64
+        )
+        particle_count = empty_pool.particle_count
+
+        # You must use get array to get a reference and not a copy
+        arrays = [p.get_array() for p in empty_pool.iter_particles()]
+
+        index = 0
+        for events in _iter_event_blocks(filename, particle_count):
+            _fill_particles(arrays, events, index)
+            index += len(events)
+
+        if index != event_count:
+            raise ValueError(f"{filename} has a malformed event!")
         return empty_pool
 
     def write(self, filename: Path, data: vectors.ParticlePool):
         with _GampWriter(filename) as stream:
-            for event in data.iter_events():
-                stream.write(event)
+            stream.write_chunk(data)
@@ -35,8 +35,11 @@ trying to learn the nature of data within PyPWA, you should move your
 attention to CSV/TSV in the SV object and forget that this ever existed.
 """
 
+import itertools
+import re
+import warnings
 from pathlib import Path
-from typing import List
+from typing import List, Optional as Opt
 
 import numpy as npy
 
@@ -80,6 +83,11 @@ class _EVILDataPlugin(templates.IDataPlugin):
 
 
 metadata = _EVILDataPlugin()
+# Names only start a line or follow a comma, which keeps the search from
+# being tried inside of every value.
+_NAMES = re.compile(r"(?<![^,\n])[^,=\s]+=")
+_BUFFER = 2 ** 20  # Size of the write buffer
+_CHUNK_SIZE = 100000  # Lines formatted at a time
 
 
 class _EVILDataTest(templates.IReadTest):
@@ -121,6 +129,51 @@ class _EVILReader(templates.ReaderBase):
             self.__numpy_array[name] = value
         return self.__numpy_array
 
+    def read_chunk(self, size: int) -> npy.ndarray:
+        lines = list(itertools.takewhile(
+            lambda line: line.strip(),
+            itertools.islice(self.__file_handle, size)
+        ))
+        if not lines:
+            raise StopIteration
+
+        # When every line has the columns in the same order, the names
+        # can be dropped and the values converted all at once.
+        text = "".join(lines)
+        names = self.__numpy_array.dtype.names
+        header = [name + "=" for name in names]
+        if _NAMES.findall(text) != header * len(lines):
+            return self.__parse_by_name(lines)
+        text = _NAMES.sub("", text).replace(",", " ")
+
+        # Unparsable values stop fromstring early, which the count catches
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            values = npy.fromstring(text, sep=" ")
+
+        if len(values) != len(lines) * len(names):
+            raise ValueError("Every line must have the same columns!")
+        values = values.reshape(len(lines), len(names))
+
+        chunk = npy.empty(len(lines), self.__numpy_array.dtype)
+        for column_index, name in enumerate(names):
+            chunk[name] = values[:, column_index]
+        return chunk
+
+    def __parse_by_name(self, lines: List[str]) -> npy.ndarray:
+        # Slow path for lines whose columns aren't in the first line's order
+        chunk = npy.empty(len(lines), self.__numpy_array.dtype)
+        for index, line in enumerate(lines):
+            columns = dict(
+                column.split("=")
+                for column in line.strip("\n").strip(" ").split(",")
+            )
+            if sorted(columns) != sorted(chunk.dtype.names):
+                raise ValueError("Every line must have the same columns!")
+            for name, value in columns.items():
+                chunk[name][index] = value
+        return chunk
+
     def __get_columns(self) -> List[str]:
         string = self.__file_handle.readline().strip("\n").strip(" ")
         if string == "":
@@ -147,33 +200,45 @@ class _EVILWriter(templates.WriterBase):
 
     def __init__(self, filename: Path):
         self.__column_names: List[str] = None
+        self.__line_format: str = None
         self.__filename = filename
-        self.__file_handle = filename.open("w")
+        self.__file_handle = filename.open("w", buffering=_BUFFER)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.__filename})"
 
     def write(self, data: npy.ndarray):
+        self.write_chunk(npy.atleast_1d(data))
+
+    def write_chunk(self, data: npy.ndarray):
         self.__error_check(data)
-        line = self.__get_line(data)
-        self.__file_handle.write(line)
+
+        for start in range(0, len(data), _CHUNK_SIZE):
+            self.__write_rows(data[start:start + _CHUNK_SIZE])
+
+    def __write_rows(self, data: npy.ndarray):
+        values = npy.empty((len(data), len(self.__column_names)))
+        for column_index, column in enumerate(self.__column_names):
+            values[:, column_index] = data[column]
+
+        line_format = self.__line_format
+        self.__file_handle.write(
+            "".join([line_format % tuple(row) for row in values.tolist()])
+        )
 
     def __error_check(self, data: npy.ndarray):
         if not self.__column_names:
             self.__column_names = list(data.dtype.names)
-
-    def __get_line(self, data: npy.ndarray) -> str:
-        line = ""
-        for column_index, column in enumerate(self.__column_names):
-            line += "," if column_index > 0 else ""
-            line += "%s=%.20f" % (column, data[column])
-        return line + "\n"
+            self.__line_format = ",".join(
+                ["%s=%%.20f" % column.replace("%", "%%")
+                 for column in self.__column_names]
+            ) + "\n"
 
     def close(self):
         self.__file_handle.close()
 
 
-class _EVILMemory(templates.IMemory):
+class _EVILMemory(templates.IMemory, templates.IColumnMemory):
 
     def __init__(self):
         super(_EVILMemory, self).__init__()
@@ -182,20 +247,33 @@ class _EVILMemory(templates.IMemory):
         return f"{self.__class__.__name__}()"
 
     def parse(self, filename: Path) -> npy.ndarray:
+        return self.parse_columns(filename, None)
+
+    def parse_columns(
+            self, filename: Path, columns: Opt[List[str]],
+            precision: npy.floating = None) -> npy.ndarray:
         with _EVILReader(filename) as reader:
-            array = self.__get_empty_array(filename, len(reader))
-            for index, event in enumerate(reader):
-                array[index] = event
-        return array
+            dtype = self.__get_dtype(reader.fields, columns, precision)
+            array = npy.empty(len(reader), dtype)
+
+            index = 0
+            for chunk in reader.iter_chunks(_CHUNK_SIZE):
+                for name in dtype.names:
+                    array[name][index:index + len(chunk)] = chunk[name]
+                index += len(chunk)
+        return array[:index]
 
     @staticmethod
-    def __get_empty_array(filename: Path, array_length: int) -> npy.ndarray:
-        with filename.open() as stream:
-            split = stream.readline().split(",")
-            types = [(column.split("=")[0], "f8") for column in split]
-        return npy.zeros(array_length, types)
+    def __get_dtype(
+            fields: List[str], columns: Opt[List[str]],
+            precision: Opt[npy.floating]) -> npy.dtype:
+        for column in columns if columns else []:
+            if column not in fields:
+                raise ValueError(f"EVIL file has no column {column}!")
+
+        precision = precision or npy.float64
+        return npy.dtype([(name, precision) for name in columns or fields])
 
     def write(self, filename: Path, data: npy.ndarray):
         with _EVILWriter(filename) as iterator:
-            for event in npy.nditer(data):
-                iterator.write(event)
+            iterator.write_chunk(data)
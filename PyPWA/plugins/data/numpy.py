@@ -16,11 +16,14 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import struct
 from pathlib import Path
+from typing import List, Optional as Opt, Tuple
 
 import numpy as npy
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.file import misc
 from PyPWA.libs.file.processor import templates, DataType
 
 __credits__ = ["Christopher Banks", "Keandre Palmer", "Mark Jones"]
@@ -59,6 +62,9 @@ class _NumpyDataPlugin(templates.IDataPlugin):
 
 
 metadata = _NumpyDataPlugin()
+_MAGIC = npy.lib.format.MAGIC_PREFIX
+_ALIGN = 64  # The size of the header must be a multiple of this
+_MAX_LENGTH = 2 ** 63 - 1  # Reserves the header space for any length
 
 
 class _NumpyDataTest(templates.IReadTest):
@@ -75,9 +81,10 @@ class _NumpyDataTest(templates.IReadTest):
     @staticmethod
     def __can_load_binary(file_location):
         # type: (Path) -> bool
+        # Only the magic string of the header is read
         try:
-            npy.load(str(file_location))
-            return True
+            with file_location.open("rb") as stream:
+                return stream.read(len(_MAGIC)) == _MAGIC
         except Exception:
             return False
 
@@ -95,7 +102,7 @@ class _NumpyReader(templates.ReaderBase):
 
     def __init__(self, filename: Path):
         self.__filename = filename
-        self.__array = npy.load(str(filename))
+        self.__array = npy.load(str(filename), mmap_mode="r")
         self.__counter = 0
 
     def __repr__(self) -> str:
@@ -111,6 +118,13 @@ class _NumpyReader(templates.ReaderBase):
         else:
             raise StopIteration
 
+    def read_chunk(self, size: int) -> npy.ndarray:
+        if self.__counter >= len(self):
+            raise StopIteration
+        chunk = self.__array[self.__counter:self.__counter + size]
+        self.__counter += len(chunk)
+        return chunk
+
     def reset(self):
         self.__counter = 0
 
@@ -124,36 +138,99 @@ class _NumpyReader(templates.ReaderBase):
 
 class _NumpyWriter(templates.WriterBase):
 
+    """Appends the raw rows straight to the file
+
+    The header is written before the first row, with enough space
+    reserved for any length, and is rewritten with the real length when
+    the writer is closed.
+    """
+
     def __init__(self, filename: Path):
-        self.__array: npy.ndarray = False
+        # Matches numpy.save, which adds the extension if it's missing
+        if filename.suffix != ".npy":
+            filename = Path(str(filename) + ".npy")
+
         self.__filename = filename
+        self.__file_handle = filename.open("wb")
+        self.__dtype: npy.dtype = None
+        self.__shape: Tuple[int, ...] = ()
+        self.__header_size = 0
+        self.__length = 0
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
     def write(self, data: npy.void):
-        if not isinstance(self.__array, npy.ndarray):
-            self.__array = npy.zeros(1, dtype=data.dtype)
-            self.__array[0] = data
-        else:
-            self.__array = npy.resize(self.__array, self.__array.size + 1)
-            self.__array[-1] = data
+        self.write_chunk(npy.atleast_1d(data))
+
+    def write_chunk(self, data: npy.ndarray):
+        if self.__dtype is None:
+            self.__dtype, self.__shape = data.dtype, data.shape[1:]
+            self.__write_header(_MAX_LENGTH)
+
+        data = npy.ascontiguousarray(data, self.__dtype)
+        self.__file_handle.write(data.tobytes())
+        self.__length += len(data)
+
+    def __write_header(self, length: int):
+        header = repr({
+            "descr": npy.lib.format.dtype_to_descr(self.__dtype),
+            "fortran_order": False,
+            "shape": (length,) + self.__shape
+        })
+
+        # Version 2.0 has room for a 4 byte header length
+        if not self.__header_size:
+            size = len(_MAGIC) + 6 + len(header) + 1
+            self.__header_size = size + (-size % _ALIGN)
+
+        header_length = self.__header_size - len(_MAGIC) - 6
+        header = header.ljust(header_length - 1) + "\n"
+
+        self.__file_handle.write(_MAGIC + bytes([2, 0]))
+        self.__file_handle.write(struct.pack("<I", header_length))
+        self.__file_handle.write(header.encode("latin1"))
 
     def close(self):
-        npy.save(str(self.__filename), self.__array)
+        if self.__dtype is None:
+            self.__dtype = npy.dtype(npy.float64)
+            self.__write_header(_MAX_LENGTH)
 
+        self.__file_handle.seek(0)
+        self.__write_header(self.__length)
+        self.__file_handle.close()
 
-class _NumpyMemory(templates.IMemory):
+
+class _NumpyMemory(
+        templates.IMemory, templates.IMemoryMap, templates.IColumnMemory):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
+    def memory_map(self, filename: Path, mmap_mode: str) -> npy.ndarray:
+        # Text files can't be mapped, so they're loaded instead
+        try:
+            return npy.load(str(filename), mmap_mode=mmap_mode)
+        except Exception:
+            return self.___load_text(filename)
+
     def parse(self, filename: Path) -> npy.ndarray:
         try:
             return npy.load(str(filename))
         except Exception:
             return self.___load_text(filename)
 
+    def parse_columns(
+            self, filename: Path, columns: Opt[List[str]],
+            precision: npy.floating = None) -> npy.ndarray:
+        # Only the selected columns are copied out of the memory map
+        data = self.memory_map(filename, "r")
+        if columns:
+            data = misc.select_columns(data, columns)
+        if precision:
+            data = misc.set_precision(data, precision)
+        return npy.array(data) if isinstance(data, npy.memmap) else data
+
     @staticmethod
     def ___load_text(filename: Path) -> npy.ndarray:
         if filename.suffix == ".pf":
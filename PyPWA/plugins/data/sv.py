@@ -17,9 +17,12 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import csv
+import itertools
+import multiprocessing
 import os
+import warnings
 from pathlib import Path
-from typing import List
+from typing import List, Optional as Opt, Tuple
 
 import numpy as npy
 
@@ -33,6 +36,9 @@ __version__ = VERSION
 
 
 HEADER_SEARCH_BITS = 8192
+_BUFFER = 2 ** 20  # Size of the write buffer
+_CHUNK_SIZE = 100000  # Rows formatted at a time
+_BLOCK_SIZE = 2 ** 24  # Bytes parsed at a time
 
 
 class _SvDataPlugin(templates.IDataPlugin):
@@ -119,6 +125,19 @@ class _SvReader(templates.ReaderBase):
 
         return self.__array
 
+    def read_chunk(self, size: int) -> npy.ndarray:
+        rows = list(itertools.takewhile(
+            len, itertools.islice(self.__reader, size)
+        ))
+        if not rows:
+            raise StopIteration
+
+        values = npy.array(rows, npy.float64)
+        chunk = npy.empty(len(rows), self.__array.dtype)
+        for column_index, element in enumerate(self.__elements):
+            chunk[element] = values[:, column_index]
+        return chunk
+
     def get_event_count(self) -> int:
         if not self.__event_count:
             length = misc.get_file_length(self.__filename)
@@ -139,11 +158,18 @@ class _SvReader(templates.ReaderBase):
 
 class _SvWriter(templates.WriterBase):
 
+    """Formats whole chunks of rows into a single string
+
+    Each column is formatted in its own type, which matches the repr of
+    each value, so the values read back in are identical to the values
+    written out.
+    """
+
     def __init__(self, filename: Path):
         self.__filename = filename
-        self.__file_handle = open(str(filename), "w")
+        self.__file_handle = open(str(filename), "w", buffering=_BUFFER)
         self.__dialect = self.__get_dialect(filename)
-        self.__writer: csv.DictWriter = None
+        self.__delimiter: str = None
         self.__field_names: List[str] = None
 
     def __repr__(self) -> str:
@@ -157,49 +183,184 @@ class _SvWriter(templates.WriterBase):
             return csv.excel
 
     def write(self, data: npy.ndarray):
-        if not self.__writer:
+        self.write_chunk(data)
+
+    def write_chunk(self, data: npy.ndarray):
+        if not self.__field_names:
             self.__setup_writer(data)
-        self.__write_row(data)
+
+        for start in range(0, len(data), _CHUNK_SIZE):
+            self.__write_rows(data[start:start + _CHUNK_SIZE])
+
+    def __write_rows(self, data: npy.ndarray):
+        columns = [
+            data[field_name].astype(str).tolist()
+            for field_name in self.__field_names
+        ]
+
+        join = self.__delimiter.join
+        self.__file_handle.write(
+            "".join([join(row) + os.linesep for row in zip(*columns)])
+        )
 
     def __setup_writer(self, data: npy.ndarray):
         self.__field_names = list(data.dtype.names)
-        self.__writer = csv.DictWriter(
-            self.__file_handle,
-            fieldnames=self.__field_names,
-            dialect=self.__dialect,
+        writer = csv.writer(
+            self.__file_handle, self.__dialect,
             lineterminator=os.linesep  # Fix issue where \r\n is used on Linux
         )
-        self.__writer.writeheader()
+        writer.writerow(self.__field_names)
 
-    def __write_row(self, data: npy.ndarray):
-        dict_data = {}
-        for field_name in self.__field_names:
-            dict_data[field_name] = repr(data[0][field_name])
-        self.__writer.writerow(dict_data)
+        self.__delimiter = self.__dialect.delimiter
 
     def close(self):
         self.__file_handle.close()
 
 
-class _SvMemory(templates.IMemory):
+def parse(
+        filename: Path, columns: Opt[List[str]] = None,
+        processes: int = 1,
+        precision: npy.floating = npy.float64) -> npy.ndarray:
+    """Parses a CSV or TSV file in large blocks
+
+    The values of each block are converted all at once, and only the
+    requested columns are kept. With more than one process, the file is
+    split into byte ranges on line boundaries and each range is parsed
+    by its own process.
+
+    :param filename: The CSV or TSV file to parse
+    :param columns: The names of the columns to keep, defaults to all
+    :param processes: How many processes to parse with
+    :param precision: The float type of the columns
+    :return: Structured array of the selected columns
+    :raises ValueError: If a row has the wrong number of values, or a
+        requested column doesn't exist.
+    """
+    header_end, names, delimiter, quote = _read_header(filename)
+    columns = names if columns is None else columns
+    for column in columns:
+        if column not in names:
+            raise ValueError(f"{filename} has no column {column}!")
+
+    indices = [names.index(column) for column in columns]
+    dtype = npy.dtype([(column, precision) for column in columns])
+    ranges = _split_file(filename, header_end, processes)
+    arguments = [
+        (filename, start, end, delimiter, quote, len(names), indices, dtype)
+        for start, end in ranges
+    ]
+
+    if len(arguments) > 1:
+        with multiprocessing.Pool(len(arguments)) as pool:
+            arrays = pool.starmap(_parse_range, arguments)
+    else:
+        arrays = [_parse_range(*argument) for argument in arguments]
+
+    if not arrays:
+        return npy.empty(0, dtype)
+    return arrays[0] if len(arrays) == 1 else npy.concatenate(arrays)
+
+
+def _read_header(filename: Path) -> Tuple[int, List[str], bytes, bytes]:
+    with filename.open("rb") as stream:
+        header = stream.readline()
+
+    with filename.open() as stream:
+        search_bits = stream.read(HEADER_SEARCH_BITS)
+    dialect = csv.Sniffer().sniff(search_bits, delimiters=[",", "\t"])
+
+    names = next(csv.reader([header.decode().strip()], dialect))
+    quote = (dialect.quotechar or "").encode()
+    return len(header), names, dialect.delimiter.encode(), quote
+
+
+def _split_file(
+        filename: Path, header_end: int,
+        processes: int) -> List[Tuple[int, int]]:
+    # Each boundary is moved to the start of the next line
+    size = filename.stat().st_size
+    boundaries = [header_end]
+    with filename.open("rb") as stream:
+        for index in range(1, processes):
+            stream.seek(max(
+                header_end + (size - header_end) * index // processes,
+                boundaries[-1]
+            ))
+            stream.readline()
+            boundaries.append(min(stream.tell(), size))
+    boundaries.append(size)
+
+    return [
+        (start, end) for start, end in zip(boundaries, boundaries[1:])
+        if start < end
+    ]
+
+
+def _parse_range(
+        filename: Path, start: int, end: int, delimiter: bytes,
+        quote: bytes, column_count: int, indices: List[int],
+        dtype: npy.dtype) -> npy.ndarray:
+    arrays = []
+    with filename.open("rb") as stream:
+        stream.seek(start)
+        remainder = b""
+        while start < end:
+            block = stream.read(min(_BLOCK_SIZE, end - start))
+            start += len(block)
+
+            text = remainder + block
+            cut = text.rfind(b"\n") + 1 if start < end else len(text)
+            text, remainder = text[:cut], text[cut:]
+            arrays.append(_parse_block(
+                text, delimiter, quote, column_count, indices, dtype
+            ))
+
+    if not arrays:
+        return npy.empty(0, dtype)
+    return arrays[0] if len(arrays) == 1 else npy.concatenate(arrays)
+
+
+def _parse_block(
+        text: bytes, delimiter: bytes, quote: bytes, column_count: int,
+        indices: List[int], dtype: npy.dtype) -> npy.ndarray:
+    # fromstring returns [-1] for only whitespace
+    if not text.strip():
+        return npy.empty(0, dtype)
+
+    # Numbers never hold the delimiter, so their quotes can be dropped
+    if quote and quote in text:
+        text = text.replace(quote, b"")
+
+    # Unparsable values stop fromstring early, which the counts catch
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        values = npy.fromstring(text.replace(delimiter, b" "), sep=" ")
+
+    rows = len(values) // column_count
+    if len(values) % column_count or \
+            text.count(delimiter) != rows * (column_count - 1):
+        raise ValueError("Rows must all have the same number of values!")
+
+    values = values.reshape(rows, column_count)
+    array = npy.empty(rows, dtype)
+    for name, index in zip(dtype.names, indices):
+        array[name] = values[:, index]
+    return array
+
+
+class _SvMemory(templates.IMemory, templates.IColumnMemory):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
     def parse(self, filename: Path) -> npy.ndarray:
-        data_array = self.__get_array(filename)
-        with _SvReader(filename) as reader:
-            for index, event in enumerate(reader):
-                data_array[index] = event
-        return data_array
+        return parse(filename)
 
-    @staticmethod
-    def __get_array(filename: Path) -> npy.ndarray:
-        with _SvReader(filename) as reader:
-            event = reader.next()
-        return npy.zeros(reader.get_event_count(), event.dtype)
+    def parse_columns(
+            self, filename: Path, columns: Opt[List[str]],
+            precision: npy.floating = None) -> npy.ndarray:
+        return parse(filename, columns, precision=precision or npy.float64)
 
     def write(self, filename: Path, data: npy.ndarray):
         with _SvWriter(filename) as writer:
-            for event in data:
-                writer.write(npy.array([event], dtype=data.dtype))
+            writer.write_chunk(data)
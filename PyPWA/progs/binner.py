@@ -22,7 +22,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from PyPWA import AUTHOR, VERSION
-from PyPWA.libs import binning
+from PyPWA.libs import binning, function
 from PyPWA.libs.file import slot_table
 
 __credits__ = ["Mark Jones"]
@@ -65,17 +65,27 @@ def start_binning():
 
     # Actually bin the data
     if results.execute:
-        bf = binning.BinFactory(slot)
+        bf = binning.BinFactory(slot, results.processes)
 
         for key in metadata.keys():
-            bf.add_fixed_range(
-                binning.BinType(metadata[key]["variable"]),
-                metadata[key]["lower"], metadata[key]["upper"],
-                metadata[key]["num"]
-            )
+            if "function" in metadata[key]:
+                variable = metadata[key]["variable"]
+                bf.add_variable(variable, function.load(
+                    Path(metadata[key]["function"]), variable
+                ))
+            else:
+                variable = binning.BinType(metadata[key]["variable"])
+
+            if metadata[key].get("type", "range") == "count":
+                bf.add_fixed_count(variable, metadata[key]["num"])
+            else:
+                bf.add_fixed_range(
+                    variable, metadata[key]["lower"],
+                    metadata[key]["upper"], metadata[key]["num"]
+                )
 
         bf.execute()
-        binned_slot.bin(bf.produced_truth_table)
+        binned_slot.stream_bins(bf)
 
     # Write out the data to a directory if requested.
     if results.make_dirs:
@@ -108,6 +118,12 @@ def _arguments() -> argparse.ArgumentParser.parse_args:
         help="Output the binned data into a bin_data directory"
     )
 
+    arguments.add_argument(
+        "--processes", "-p", type=int, default=1,
+        help="Processes used to calculate the binning variables the "
+             "first time the slot is binned"
+    )
+
     bin_subparsers = arguments.add_subparsers(dest="type")
 
     # Range
@@ -121,6 +137,12 @@ def _arguments() -> argparse.ArgumentParser.parse_args:
              "beam are supported"
     )
 
+    bin_range.add_argument(
+        "--function", "-f", type=Path,
+        help="Python file with a function named after the variable, "
+             "which calculates the variable from a chunk of the slot"
+    )
+
     bin_range.add_argument(
         "--lower-limit", "-l", type=float, required=True,
         help="Specifies the lower limit of the bins"
@@ -136,13 +158,37 @@ def _arguments() -> argparse.ArgumentParser.parse_args:
         help="Defines the range of each bin"
     )
 
+    # Count
+    bin_count = bin_subparsers.add_parser(
+        "count", help="Queues bins that each hold the same number of events"
+    )
+
+    bin_count.add_argument(
+        "--variable", "-v", type=str, required=True,
+        help="The variable to use for binning. t, tprime, mass, and "
+             "beam are supported"
+    )
+
+    bin_count.add_argument(
+        "--function", "-f", type=Path,
+        help="Python file with a function named after the variable, "
+             "which calculates the variable from a chunk of the slot"
+    )
+
+    bin_count.add_argument(
+        "--number-of-bins", "-n", type=int, required=True,
+        help="Specifies the number of bins to split each bin above into"
+    )
+
     return arguments.parse_args()
 
 
 def _add_to_queue(
         metadata: Dict[str, Dict[str, Any]],
         results: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
-    if results.variable.lower() == "mass":
+    if results.function:
+        variable = results.variable
+    elif results.variable.lower() == "mass":
         variable = "mass"
     elif results.variable.lower() == "t":
         variable = "t"
@@ -156,11 +202,24 @@ def _add_to_queue(
     if results.type == "range":
         new_index = str(len(metadata.keys()))
         metadata[new_index] = {
+            "type": "range",
             "variable": variable,
             "lower": results.lower_limit,
             "upper": results.upper_limit,
             "num": results.number_of_bins
         }
 
+    elif results.type == "count":
+        new_index = str(len(metadata.keys()))
+        metadata[new_index] = {
+            "type": "count",
+            "variable": variable,
+            "num": results.number_of_bins
+        }
+
+    # The function's path is stored absolute, since the queue is reused
+    if results.function:
+        metadata[new_index]["function"] = str(results.function.absolute())
+
     return metadata
 
@@ -17,27 +17,64 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+import collections
+import itertools
+import multiprocessing
+import sys
+import time
 from pathlib import Path
-from typing import List, Optional as Opt
+from queue import Empty
+from typing import Iterator, List, Optional as Opt, Tuple
 
+import tables
 from tqdm import tqdm
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.file import slot_table
-from PyPWA.libs.file.processor import DataProcessor
+from PyPWA.libs.file.processor import DataProcessor, SUPPORTED_DATA
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
 __version__ = VERSION
 
 
+_CHUNK_SIZE = 10000  # Events read from the primary file at a time
+_QUEUED_CHUNKS = 4  # Chunks each reading process can get ahead by
+
+
+_COMPRESSION = ["blosc", "blosc:lz4", "blosc:zstd", "zlib", "bzip2"]
+
+
 def data():
     results = _arguments()
+    filters = tables.Filters(
+        results.complevel, results.complib, not results.no_shuffle
+    )
+
+    if results.repack:
+        slot_table.repack(
+            results.file, results.repack, filters, results.chunk_rows
+        )
+        _benchmark(results.file)
+        _benchmark(results.repack)
+        return
+
+    if results.benchmark:
+        _benchmark(results.file)
+        return
+
+    if not results.slot:
+        print("A slot name is needed to add data to the table")
+        sys.exit(126)
+
     table = slot_table.SlotFactory(results.file, "a")
 
     # If a new slot, process the primary data
     if results.slot not in table.slots:
-        _process_primary_data(table, results.slot, results.primary)
+        _process_primary_data(
+            table, results.slot, results.primary, results.precision,
+            results.processes, filters, results.chunk_rows
+        )
 
     # Process the extras
     slot = table.get_slot(results.slot)
@@ -52,12 +89,13 @@ def _arguments() -> argparse.ArgumentParser.parse_args:
     )
 
     arguments.add_argument(
-        "slot", type=str, help="Name of the dataset"
+        "slot", type=str, nargs="?", help="Name of the dataset"
     )
 
     arguments.add_argument(
-        "--primary", "-p", type=Path,
-        help="Primary data for the dataset, IE Gamp data"
+        "--primary", "-p", type=Path, nargs="+",
+        help="Primary data for the dataset, IE Gamp data. Multiple files "
+             "are appended in the order given."
     )
 
     arguments.add_argument(
@@ -65,23 +103,179 @@ def _arguments() -> argparse.ArgumentParser.parse_args:
         help="Any extra data to add to the dataset."
     )
 
+    arguments.add_argument(
+        "--precision", choices=["float32", "float64"], default="float64",
+        help="Float precision of a new dataset, float32 halves its size."
+    )
+
+    arguments.add_argument(
+        "--processes", type=int, default=1,
+        help="Number of primary files to parse at the same time."
+    )
+
+    arguments.add_argument(
+        "--complevel", type=int, default=0, choices=range(10),
+        metavar="[0-9]",
+        help="Compression level of a new slot or repacked file, 0 "
+             "disables compression."
+    )
+
+    arguments.add_argument(
+        "--complib", choices=_COMPRESSION, default="blosc",
+        help="Compression library to use when complevel is set."
+    )
+
+    arguments.add_argument(
+        "--no-shuffle", action="store_true",
+        help="Don't byte shuffle before compressing, shuffling usually "
+             "makes floats compress better."
+    )
+
+    arguments.add_argument(
+        "--chunk-rows", type=int,
+        help="Rows in each HDF5 chunk, match it to how many rows are read "
+             "at a time. Picked from the table length if not set."
+    )
+
+    arguments.add_argument(
+        "--repack", type=Path, metavar="OUTPUT",
+        help="Copy every slot into OUTPUT with the compression and chunk "
+             "options, then compare the read speed of both files."
+    )
+
+    arguments.add_argument(
+        "--benchmark", action="store_true",
+        help="Print the read speed of every slot in the table."
+    )
+
     return arguments.parse_args()
 
 
 def _process_primary_data(table: slot_table.SlotFactory,
-                          slot_name: str, primary: Path):
-    if not primary:
+                          slot_name: str, primaries: List[Path],
+                          precision: str = "float64",
+                          processes: int = 1,
+                          filters: tables.Filters = None,
+                          chunk_rows: int = None):
+    if not primaries:
         raise RuntimeError("Primary must be provided with new slots")
 
-    read = DataProcessor().get_reader(primary)
-    table.add_slot(slot_name, read.fields, read.is_particle_pool, len(read))
+    fields, is_particle_pool, length = _inspect_primaries(primaries)
+    table.add_slot(
+        slot_name, fields, is_particle_pool, length, precision, filters,
+        chunk_rows
+    )
     slot = table.get_slot(slot_name)
 
-    for event in tqdm(read):
-        slot.root_append(event)
+    with tqdm(total=length) as progress:
+        for chunk in _iter_primaries(primaries, processes):
+            slot.root_append(chunk)
+            if is_particle_pool:
+                progress.update(chunk.event_count)
+            else:
+                progress.update(len(chunk))
     slot.flush()
 
 
+def _inspect_primaries(primaries: List[Path]):
+    # Every primary file must have the same layout to share a slot
+    layouts, length = set(), 0
+    for primary in primaries:
+        with DataProcessor.get_reader(primary) as read:
+            layouts.add((tuple(read.fields), read.is_particle_pool))
+            length += len(read)
+
+    if len(layouts) != 1:
+        raise ValueError("Primary files must all have the same fields!")
+
+    fields, is_particle_pool = layouts.pop()
+    return list(fields), is_particle_pool, length
+
+
+def _iter_primaries(
+        primaries: List[Path], processes: int) -> Iterator[SUPPORTED_DATA]:
+    if processes > 1 and len(primaries) > 1:
+        yield from _iter_in_parallel(primaries, processes)
+    else:
+        for primary in primaries:
+            with DataProcessor.get_reader(primary) as read:
+                yield from read.iter_chunks(_CHUNK_SIZE)
+
+
+def _iter_in_parallel(
+        primaries: List[Path], processes: int) -> Iterator[SUPPORTED_DATA]:
+    """Reads up to processes files at once, in the order given
+
+    Each file is read by its own process, which sends its chunks through
+    a bounded queue, so only a few chunks per file are held while this
+    process writes the earlier files to the table.
+    """
+    waiting = iter(primaries)
+    readers = collections.deque(
+        _start_reader(primary)
+        for primary in itertools.islice(waiting, processes)
+    )
+
+    try:
+        while readers:
+            yield from _receive_chunks(*readers[0])
+            readers.popleft()[0].join()
+            readers.extend(
+                _start_reader(primary)
+                for primary in itertools.islice(waiting, 1)
+            )
+    finally:
+        for reader, _ in readers:
+            reader.terminate()
+            reader.join()
+
+
+def _start_reader(
+        primary: Path
+) -> Tuple[multiprocessing.Process, multiprocessing.Queue]:
+    queue = multiprocessing.Queue(_QUEUED_CHUNKS)
+    reader = multiprocessing.Process(
+        target=_send_chunks, args=(primary, queue), daemon=True
+    )
+    reader.start()
+    return reader, queue
+
+
+def _send_chunks(primary: Path, queue: multiprocessing.Queue):
+    # None marks the end of the file, errors are raised by the writer
+    try:
+        with DataProcessor.get_reader(primary) as read:
+            for chunk in read.iter_chunks(_CHUNK_SIZE):
+                queue.put(chunk)
+    except Exception as error:
+        queue.put(error)
+    else:
+        queue.put(None)
+
+
+def _receive_chunks(
+        reader: multiprocessing.Process,
+        queue: multiprocessing.Queue) -> Iterator[SUPPORTED_DATA]:
+    while True:
+        try:
+            chunk = queue.get(timeout=1)
+        except Empty:
+            if reader.exitcode is None:
+                continue
+
+            # Anything sent before the reader exited has arrived by now
+            try:
+                chunk = queue.get(timeout=1)
+            except Empty:
+                raise RuntimeError("Primary reader stopped unexpectedly!")
+
+        if chunk is None:
+            return
+        elif isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+
 def _process_extra_data(slot: slot_table.DataSlot, extras: Opt[List[Path]]):
     dp = DataProcessor()
 
@@ -91,3 +285,26 @@ def _process_extra_data(slot: slot_table.DataSlot, extras: Opt[List[Path]]):
     for extra in tqdm(extras):
         array = dp.parse(extra)
         slot.add_data(extra.stem, array)
+
+
+def _benchmark(file: Path):
+    table = slot_table.SlotFactory(file, "r")
+    size = file.stat().st_size / 1024 ** 2
+    print(f"{file}: {size:.2f} MB")
+
+    for name in table.slots:
+        root = table.get_slot(name).get_root()
+        leaves = getattr(root, "leaves", [root])
+        row_size = sum(leaf.dtype.itemsize for leaf in leaves)
+        megabytes = row_size * len(root) / 1024 ** 2
+
+        start = time.perf_counter()
+        for _ in slot_table.iter_root(root, _CHUNK_SIZE):
+            pass
+        seconds = time.perf_counter() - start
+
+        print(
+            f"  {name}: {len(root)} events in {seconds:.3f}s, "
+            f"{megabytes / max(seconds, 1e-9):.1f} MB/s"
+        )
+    table.close()
@@ -26,7 +26,7 @@ import logging
 import multiprocessing
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional as Opt, Tuple
 
 import numpy as npy
 import yaml
@@ -40,16 +40,22 @@ _LOGGER = logging.getLogger(__file__)
 
 # Function, Intensity, Setup,
 # Parameters,
-# Data, Slot Name, Output, Enable Cache
+# Data, Slot Name, Output, Enable Cache,
+# Seed, Columns, Precision
 _SETTINGS = Tuple[
     Path, str, str,
     Dict[str, npy.float64],
-    Path, str, Path, bool
+    Path, str, Path, bool,
+    Opt[int], Opt[List[str]], Opt[str]
 ]
 
+_PRECISIONS = ("float32", "float64")
+
 _EXAMPLE = {
     "Version": 1,
     "Processes": multiprocessing.cpu_count(),
+    "Seed": 12345,
+    "Streaming": False,
     "Function": {
         "Path": 'function.py',
         "Intensity Name": "intensity",
@@ -65,13 +71,17 @@ _EXAMPLE = {
     "Data": {
         "Path": "data.type",
         "Slot": "slot_name_if_table remove if not using tables.",
-        "Output": "output.txt remove if using tables"
+        "Output": "output.txt remove if using tables",
+        "Columns": ["remove", "to", "use", "all", "columns"],
+        "Precision": "float64"
     }
 }
 
 _TEMPLATE = {
     "Version": int,
     "Processes": int,
+    "Seed": int,
+    "Streaming": bool,
     "Function": {
         "Path": str,
         "Intensity Name": str,
@@ -81,7 +91,9 @@ _TEMPLATE = {
     "Data": {
         "Path": str,
         "Slot": str,
-        "Output": str
+        "Output": str,
+        "Columns": list,
+        "Precision": str
     }
 }
 
@@ -97,10 +109,13 @@ def simulation(arguments: List[str] = sys.argv[1:]):
             print("Try 'pysimulate config --help")
             sys.exit(1)
 
+    processes = config.get("Processes", multiprocessing.cpu_count())
+    streaming = args.streaming or config.get("Streaming", False)
+
     print("Parsing provided parameters")
     function_path, intensity_name, setup_name, \
-        parameters, data_path, slot_name, output, use_cache = \
-        _process_arguments(config, args)
+        parameters, data_path, slot_name, output, use_cache, seed, \
+        columns, precision = _process_arguments(config, args)
 
     print("Loading data")
     if slot_name:
@@ -108,7 +123,9 @@ def simulation(arguments: List[str] = sys.argv[1:]):
         data = factory.get_slot(slot_name)
 
     else:
-        data = processor.DataProcessor(use_cache).parse(data_path)
+        data = processor.DataProcessor(use_cache).parse(
+            data_path, columns=columns, precision=precision
+        )
 
     print("Loading functions")
     try:
@@ -125,11 +142,16 @@ def simulation(arguments: List[str] = sys.argv[1:]):
 
     print("Starting Simulation")
     rejection = simulate.calculate_intensities(
-        intensity, setup, parameters, data
+        intensity, setup, parameters, data, processes, seed=seed,
+        streaming=streaming, columns=columns
     )
 
+    # The table is opened read only so processes can read it as well
     if slot_name:
-        data.add_data("rejection", rejection)
+        factory.close()
+        factory = slot_table.SlotFactory(data_path, "a")
+        factory.get_slot(slot_name).add_data("rejection", rejection)
+        factory.close()
 
     if output:
         processor.DataProcessor().write(output, rejection)
@@ -183,6 +205,28 @@ def _arguments(args: List[str]) -> argparse.ArgumentParser.parse_args:
         help="Parameters to simulate with, as: parameter_name value"
     )
 
+    arguments.add_argument(
+        "--seed", type=int, metavar="SEED",
+        help="Seed for the rejection method, for reproducible results"
+    )
+
+    arguments.add_argument(
+        "--columns", nargs="+", metavar="COLUMN",
+        help="Only load these columns of the data for the intensity."
+    )
+
+    arguments.add_argument(
+        "--precision", choices=_PRECISIONS,
+        help="Float precision to load the data with, float32 halves the "
+             "memory used. Defaults to the precision of the file."
+    )
+
+    arguments.add_argument(
+        "--streaming", action="store_true",
+        help="Spill the intensities to disk instead of keeping them in "
+             "memory, for tables larger than memory."
+    )
+
     arguments.add_argument(
         "--function", "-f", metavar="PYTHON_FILE", type=Path,
         help="Python source file containing the functions for intensity for "
@@ -243,7 +287,7 @@ def _process_arguments(
         combined["Parameters"] = dict()
     else:
         for key in combined["Parameters"]:
-            combined["Parameters"][key] = npy.float(combined["Parameters"][key])
+            combined["Parameters"][key] = npy.float64(combined["Parameters"][key])
 
     # Convert str to Path, if in configuration file
     if "Path" in combined["Data"]:
@@ -287,11 +331,27 @@ def _process_arguments(
     # Append provided parameters
     if args.param:
         for param in args.param:
-            combined["Parameters"][param[0]] = npy.float(param[1])
+            combined["Parameters"][param[0]] = npy.float64(param[1])
 
     # Set caching variable
     combined["Data"]["Cache"] = args.disable_cache
 
+    # Replace seed if provided it or set it if unset
+    if args.seed is not None or "Seed" not in combined:
+        combined["Seed"] = args.seed
+
+    # Replace columns if provided or set them if unset
+    if args.columns or "Columns" not in combined["Data"]:
+        combined["Data"]["Columns"] = args.columns
+
+    # Replace precision if provided or set it if unset
+    if args.precision or "Precision" not in combined["Data"]:
+        combined["Data"]["Precision"] = args.precision
+
+    if combined["Data"]["Precision"] not in _PRECISIONS + (None,):
+        print(f"Precision must be one of {', '.join(_PRECISIONS)}")
+        sys.exit(126)
+
     # We only check the values that don't have defaults and have to be set
     try:
         func_path = combined["Function"]["Path"]
@@ -315,5 +375,6 @@ def _process_arguments(
         func_path, combined["Function"]["Intensity Name"],
         combined["Function"]["Setup Name"], combined["Parameters"],
         data_path, combined["Data"]["Slot"], combined["Data"]["Output"],
-        combined["Data"]["Cache"]
+        combined["Data"]["Cache"], combined["Seed"],
+        combined["Data"]["Columns"], combined["Data"]["Precision"]
     )
@@ -0,0 +1,147 @@
+import numpy as npy
+import pytest
+
+from PyPWA.libs.file import cache, misc
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(misc, "get_cache_uri", lambda: tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def source(tmp_path):
+    location = tmp_path / "source.txt"
+    location.write_text("some source data\n")
+    return location
+
+
+@pytest.fixture
+def structured_data():
+    data = npy.zeros(100, [("x", "f8"), ("y", "f4")])
+    data["x"] = npy.random.rand(100)
+    data["y"] = npy.random.rand(100)
+    return data
+
+
+"""
+Test Columnar Cache
+"""
+
+
+def test_cache_array_is_memory_mapped(cache_dir, source, structured_data):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+
+    assert (cache_dir / "source.cache" / "header.json").exists()
+    assert (cache_dir / "source.cache" / "data.npy").exists()
+
+    loaded = cache.CacheFactory().get_cache(source)
+    assert loaded.is_valid
+    data = loaded.read_cache()
+    assert isinstance(data, npy.memmap)
+    npy.testing.assert_array_equal(data, structured_data)
+
+
+def test_cache_particle_pool(cache_dir, source, random_particle_pool):
+    cache.CacheFactory().get_cache(source).write_cache(random_particle_pool)
+
+    data = cache.CacheFactory().get_cache(source).read_cache()
+    assert data.particle_count == random_particle_pool.particle_count
+    for loaded, original in zip(data.stored, random_particle_pool.stored):
+        assert loaded == original
+
+
+def test_cache_falls_back_to_pickle(cache_dir, source):
+    cache.CacheFactory().get_cache(source).write_cache({"a": 1})
+    assert cache.CacheFactory().get_cache(source).read_cache() == {"a": 1}
+
+
+def test_changed_source_invalidates_cache(cache_dir, source, structured_data):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+    source.write_text("changed source data\n")
+    assert not cache.CacheFactory().get_cache(source).is_valid
+
+
+def test_clear_cache_removes_cache(cache_dir, source, structured_data):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+    cleared = cache.CacheFactory(clear_cache=True).get_cache(source)
+    assert not cleared.is_valid
+    assert not (cache_dir / "source.cache" / "header.json").exists()
+
+
+"""
+Test Cache Validation
+"""
+
+
+def test_fast_validation_skips_full_hash(
+        cache_dir, source, structured_data, monkeypatch):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+
+    def fail(location):
+        raise AssertionError("Full hash shouldn't be computed")
+
+    monkeypatch.setattr(misc, "get_sha512_hash", fail)
+    assert cache.CacheFactory().get_cache(source).is_valid
+
+
+def test_touched_source_is_still_valid(cache_dir, source, structured_data):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+    source.write_text(source.read_text())
+    assert cache.CacheFactory().get_cache(source).is_valid
+
+
+def test_full_validation(cache_dir, source, structured_data):
+    full = cache.CacheFactory(validation="full")
+    full.get_cache(source).write_cache(structured_data)
+    assert full.get_cache(source).is_valid
+
+    source.write_text("some source Data\n")
+    assert not full.get_cache(source).is_valid
+
+
+def test_full_validation_needs_full_hash(cache_dir, source, structured_data):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+    assert not cache.CacheFactory(validation="full").get_cache(source).is_valid
+
+
+def test_unknown_validation():
+    with pytest.raises(ValueError):
+        cache.CacheFactory(validation="partial")
+
+
+"""
+Test Cached Columns
+"""
+
+
+def test_full_cache_serves_columns(cache_dir, source, structured_data):
+    cache.CacheFactory().get_cache(source).write_cache(structured_data)
+
+    selected = cache.CacheFactory().get_cache(source, ["y"])
+    assert selected.is_valid
+    npy.testing.assert_array_equal(
+        selected.read_cache()["y"], structured_data["y"]
+    )
+    assert selected.read_cache().dtype.names == ("y",)
+
+
+def test_column_cache_only_serves_its_columns(
+        cache_dir, source, structured_data):
+    factory = cache.CacheFactory()
+    factory.get_cache(source, ["x"]).write_cache(structured_data[["x"]])
+
+    assert factory.get_cache(source, ["x"]).is_valid
+    assert not factory.get_cache(source, ["x", "y"]).is_valid
+    assert not factory.get_cache(source).is_valid
+
+
+def test_cache_only_serves_its_precision(cache_dir, source, structured_data):
+    factory = cache.CacheFactory()
+    single = misc.set_precision(structured_data, npy.float32)
+    factory.get_cache(source, precision="float32").write_cache(single)
+
+    assert factory.get_cache(source, precision=npy.float32).is_valid
+    assert not factory.get_cache(source, precision="float64").is_valid
+    assert not factory.get_cache(source).is_valid
@@ -1,4 +1,7 @@
 from pathlib import Path
+
+import numpy as npy
+
 from PyPWA.libs.file import misc
 
 
@@ -39,3 +42,39 @@ def test_file_length_set1_csv():
 
 def test_file_length_set2_kvars():
     assert misc.get_file_length(SET2) == 12
+
+
+"""
+Tests Sampled Hash
+"""
+
+
+def test_sampled_hash_matches_for_same_file():
+    assert misc.get_sampled_hash(SET1) == misc.get_sampled_hash(SET1)
+    assert misc.get_sampled_hash(SET1) != misc.get_sampled_hash(SET2)
+
+
+def test_sampled_hash_of_large_file(tmp_path):
+    location = tmp_path / "large.bin"
+    location.write_bytes(bytes(5 * 1024 * 1024))
+    first = misc.get_sampled_hash(location)
+
+    with location.open("r+b") as stream:
+        stream.write(b"changed")
+    assert misc.get_sampled_hash(location) != first
+
+
+"""
+Tests Precision
+"""
+
+
+def test_set_precision_only_casts_floats():
+    data = npy.zeros(10, [("x", "f8"), ("count", "i8")])
+    single = misc.set_precision(data, npy.float32)
+    assert single.dtype == npy.dtype([("x", "f4"), ("count", "i8")])
+
+
+def test_set_precision_keeps_matching_data():
+    data = npy.zeros(10, "f4")
+    assert misc.set_precision(data, npy.float32) is data
@@ -0,0 +1,170 @@
+import numpy as npy
+import pytest
+import tables
+
+from PyPWA.libs.file import slot_table
+
+
+@pytest.fixture
+def factory(tmp_path):
+    table = slot_table.SlotFactory(tmp_path / "table.h5", "w")
+    yield table
+    table.close()
+
+
+"""
+Test Bulk Appends
+"""
+
+
+def test_table_append_matches_columns_by_name(factory):
+    factory.add_slot("flat", ["x", "y"], precision=npy.float32)
+    slot = factory.get_slot("flat")
+
+    data = npy.zeros(20, [("y", "f8"), ("x", "f8")])
+    data["x"], data["y"] = npy.random.rand(20), npy.random.rand(20)
+    slot.root_append(data[:10])
+    slot.root_append(data[10:])
+    slot.flush()
+
+    stored = slot.get_root().read()
+    assert stored.dtype == npy.dtype([("x", "f4"), ("y", "f4")])
+    npy.testing.assert_allclose(stored["x"], data["x"], rtol=1e-6)
+    npy.testing.assert_allclose(stored["y"], data["y"], rtol=1e-6)
+
+
+def test_read_columns(factory):
+    factory.add_slot("flat", ["x", "y"])
+    slot = factory.get_slot("flat")
+    data = npy.zeros(50, [("x", "f8"), ("y", "f8")])
+    data["x"], data["y"] = npy.random.rand(50), npy.random.rand(50)
+    slot.root_append(data)
+
+    selected = slot_table.read_columns(slot.get_root(), ["y"], 10, 20)
+    assert selected.dtype.names == ("y",)
+    npy.testing.assert_array_equal(selected["y"], data["y"][10:20])
+
+
+def test_particle_append(factory, random_particle_pool):
+    ids = [p.id for p in random_particle_pool.iter_particles()]
+    factory.add_slot("pool", ids, True)
+    slot = factory.get_slot("pool")
+
+    for chunk in random_particle_pool.split(2):
+        slot.root_append(chunk)
+    slot.flush()
+
+    stored = slot.get_root().read()
+    assert stored.event_count == random_particle_pool.event_count
+    for particle, expected in zip(
+            stored.iter_particles(), random_particle_pool.iter_particles()):
+        npy.testing.assert_array_equal(particle.e, expected.e)
+        npy.testing.assert_array_equal(particle.x, expected.x)
+
+
+def test_particle_append_needs_every_particle(factory, random_particle_pool):
+    factory.add_slot("pool", [1, 3], True)
+    with pytest.raises(ValueError):
+        factory.get_slot("pool").root_append(random_particle_pool)
+
+
+"""
+Test Compression
+"""
+
+
+def test_slot_uses_filters(factory):
+    filters = tables.Filters(5, "blosc", shuffle=True)
+    factory.add_slot("packed", ["x"], length=1000, filters=filters)
+    slot = factory.get_slot("packed")
+    slot.root_append(npy.zeros(1000, [("x", "f8")]))
+    slot.add_data("weights", npy.ones(1000))
+
+    assert slot.get_root().filters == filters
+    assert slot.get_data("weights").filters == filters
+
+
+def test_slot_chunk_rows(factory):
+    factory.add_slot("chunked", ["x"], chunk_rows=250)
+    assert factory.get_slot("chunked").get_root().chunkshape == (250,)
+
+
+def test_repack_keeps_data(tmp_path, factory, random_particle_pool):
+    ids = [p.id for p in random_particle_pool.iter_particles()]
+    factory.add_slot("pool", ids, True)
+    slot = factory.get_slot("pool")
+    slot.root_append(random_particle_pool)
+    slot.add_data("weights", npy.arange(random_particle_pool.event_count))
+    factory.close()
+
+    filters = tables.Filters(9, "zlib")
+    slot_table.repack(
+        tmp_path / "table.h5", tmp_path / "packed.h5", filters, 100
+    )
+
+    packed = slot_table.SlotFactory(tmp_path / "packed.h5", "r")
+    slot = packed.get_slot("pool")
+    for leaf in slot.get_root().leaves:
+        assert leaf.filters == filters
+        assert leaf.chunkshape == (100,)
+
+    stored = slot.get_root().read()
+    for particle, expected in zip(
+            stored.iter_particles(), random_particle_pool.iter_particles()):
+        npy.testing.assert_array_equal(
+            particle.get_array(), expected.get_array()
+        )
+    npy.testing.assert_array_equal(
+        slot.get_data("weights").read(),
+        npy.arange(random_particle_pool.event_count)
+    )
+    packed.close()
+
+
+"""
+Test Particle Reads
+"""
+
+
+@pytest.fixture
+def particle_root(factory, random_particle_pool):
+    ids = [p.id for p in random_particle_pool.iter_particles()]
+    factory.add_slot("pool", ids, True)
+    slot = factory.get_slot("pool")
+    slot.root_append(random_particle_pool)
+    slot.flush()
+    return slot.get_root()
+
+
+def test_particle_read_into_out(particle_root, random_particle_pool):
+    out = particle_root.empty_pool(100)
+    arrays = [p.get_array() for p in out.iter_particles()]
+
+    for start in range(0, random_particle_pool.event_count, 100):
+        assert particle_root.read(start, start + 100, out) is out
+        for array, expected in zip(
+                arrays, random_particle_pool.iter_particles()):
+            npy.testing.assert_array_equal(
+                array["x"], expected.x[start:start + 100]
+            )
+
+    # The buffers are filled in place, never replaced
+    assert all(
+        a is p.get_array() for a, p in zip(arrays, out.iter_particles())
+    )
+
+
+def test_particle_read_out_must_fit(particle_root):
+    with pytest.raises(ValueError):
+        particle_root.read(0, 100, particle_root.empty_pool(50))
+
+
+def test_particle_chunks_match_full_read(particle_root, random_particle_pool):
+    # Chunks share buffers, so they're checked as they're read
+    starts = range(0, random_particle_pool.event_count, 150)
+    for start, chunk in zip(starts, slot_table.iter_root(particle_root, 150)):
+        for particle, expected in zip(
+                chunk.iter_particles(), random_particle_pool.iter_particles()):
+            npy.testing.assert_array_equal(
+                particle.get_array(), expected.get_array()[start:start + 150]
+            )
@@ -1,3 +1,5 @@
+import numpy as npy
+
 from PyPWA.libs.math import vectors
 
 
@@ -41,3 +43,10 @@ def test_particle_pool_split(random_particle_pool):
             if index == 0:
                 particle_length = len(particle)
             assert len(particle) == particle_length
+
+
+def test_particle_keeps_array_precision():
+    array = npy.zeros(4, [("x", "f4"), ("y", "f4"), ("z", "f4"), ("e", "f4")])
+    particle = vectors.Particle(1, array)
+    assert particle.get_array().dtype == array.dtype
+    assert particle.split(2)[0].get_array().dtype == array.dtype
@@ -0,0 +1,373 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import functools
+import json
+from collections import OrderedDict
+
+import numpy as npy
+import pytest
+import tables
+
+from PyPWA.libs import binning
+from PyPWA.libs.file import slot_table
+from PyPWA.libs.math import reaction, vectors
+
+EVENTS = 5000
+
+
+@pytest.fixture(scope="module")
+def bin_data():
+    bins = npy.zeros(EVENTS, [(n, "f8") for n in ["mass", "beam", "t", "tp"]])
+    bins["mass"] = npy.random.uniform(-0.5, 2.5, EVENTS)
+    bins["tp"] = npy.random.uniform(0, 1, EVENTS)
+    bins["mass"][:3] = [0, 1, 2]  # Events exactly on the edges
+    return bins
+
+
+@pytest.fixture
+def table(tmp_path, bin_data):
+    factory = slot_table.SlotFactory(tmp_path / "binning.h5", "w")
+    factory.add_slot("flat", ["x"])
+    slot = factory.get_slot("flat")
+
+    data = npy.zeros(EVENTS, [("x", "f8")])
+    data["x"] = npy.arange(EVENTS)
+    slot.root_append(data)
+    slot.add_data("bin_data", bin_data)
+    yield factory
+    factory.close()
+
+
+@pytest.fixture(scope="module")
+def reaction_pool():
+    pool = vectors.ParticlePool([
+        vectors.Particle(pid, npy.random.rand(1000 * 4).view(
+            [("x", "f8"), ("y", "f8"), ("z", "f8"), ("e", "f8")]
+        )) for pid in [1, 14, 8, 9]
+    ])
+    for particle in pool.iter_particles():
+        particle.e = particle.e + 5  # Keeps the masses real
+    return pool
+
+
+@pytest.mark.parametrize("processes", [1, 3])
+def test_bin_table_is_made_in_chunks(
+        tmp_path, monkeypatch, reaction_pool, processes):
+    monkeypatch.setattr(binning, "_EVENT_CHUNK", 150)
+    pool = reaction_pool
+
+    factory = slot_table.SlotFactory(tmp_path / "bin_table.h5", "w")
+    factory.add_slot("pool", [1, 14, 8, 9], True)
+    slot = factory.get_slot("pool")
+    slot.root_append(pool)
+    binning.make_bin_table(slot, processes)
+
+    bins = slot.get_data("bin_data").read()
+    npy.testing.assert_allclose(bins["mass"], reaction.get_event_mass(pool))
+    npy.testing.assert_allclose(bins["t"], reaction.get_t(pool))
+    npy.testing.assert_allclose(bins["tp"], reaction.get_t_prime(pool))
+    npy.testing.assert_array_equal(
+        bins["beam"], pool.get_particles_by_id(1)[0].z
+    )
+    factory.close()
+
+
+@pytest.fixture
+def pool_slot(tmp_path, monkeypatch, reaction_pool):
+    monkeypatch.setattr(binning, "_EVENT_CHUNK", 150)
+    factory = slot_table.SlotFactory(tmp_path / "pool.h5", "w")
+    factory.add_slot("pool", [1, 14, 8, 9], True)
+    slot = factory.get_slot("pool")
+    slot.root_append(reaction_pool)
+    yield slot
+    factory.close()
+
+
+def test_interrupted_bin_table_is_removed(pool_slot, monkeypatch):
+    calculate = binning._get_bin_variables
+    calls = []
+
+    def interrupted(chunk):
+        calls.append(chunk)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return calculate(chunk)
+
+    monkeypatch.setattr(binning, "_get_bin_variables", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        binning.make_bin_table(pool_slot)
+    assert pool_slot.extra_data == []
+
+
+def test_partial_bin_table_is_remade(pool_slot):
+    partial = pool_slot.add_table("bin_data", binning._BIN_TYPES)
+    partial.append(npy.zeros(200, binning._BIN_TYPES))
+
+    binning.BinFactory(pool_slot)
+    assert len(pool_slot.get_data("bin_data")) == len(pool_slot)
+
+
+def _expected(values, lower, upper, count):
+    edges = npy.linspace(lower, upper, count + 1)
+    expected = {
+        "lower": values < lower,
+        "upper": values >= upper
+    }
+    for index in range(count):
+        expected[str(index)] = npy.logical_and(
+            values >= edges[index], values < edges[index + 1]
+        )
+    return expected
+
+
+"""
+Test Width Binning
+"""
+
+
+def test_width_bins_match_masks(table, bin_data):
+    factory = binning.BinFactory(table.get_slot("flat"))
+    factory.add_fixed_range(binning.BinType.MASS, 0, 2, 10)
+    factory.execute()
+
+    tree = factory.produced_truth_table
+    expected = _expected(bin_data["mass"], 0, 2, 10)
+    assert tree.keys() == expected.keys()
+    for key, mask in expected.items():
+        npy.testing.assert_array_equal(tree[key], npy.flatnonzero(mask))
+
+
+def test_nested_width_bins(table, bin_data):
+    factory = binning.BinFactory(table.get_slot("flat"))
+    factory.add_fixed_range(binning.BinType.MASS, 0, 2, 4)
+    factory.add_fixed_range(binning.BinType.T_PRIME, 0, .5, 2)
+    factory.execute()
+
+    tree = factory.produced_truth_table
+    masses = _expected(bin_data["mass"], 0, 2, 4)
+    t_primes = _expected(bin_data["tp"], 0, .5, 2)
+    for mass_key, mass in masses.items():
+        for tp_key, tp in t_primes.items():
+            npy.testing.assert_array_equal(
+                tree[mass_key][tp_key],
+                npy.flatnonzero(npy.logical_and(mass, tp))
+            )
+
+
+def test_every_event_is_binned_once(bin_data):
+    queue = OrderedDict()
+    queue[0] = {
+        "type": "width", "variable": binning.BinType.MASS,
+        "lower": 0, "upper": 2, "count": 7
+    }
+    flat, shape = binning.get_bin_index(bin_data, queue)
+    order, bounds = binning.group_by_bin(flat, shape[0])
+
+    assert shape == [9]
+    assert bounds[-1] == EVENTS
+    npy.testing.assert_array_equal(npy.sort(order), npy.arange(EVENTS))
+
+
+"""
+Test Fixed Count Binning
+"""
+
+
+def test_fixed_count_bins_are_equal(table, bin_data):
+    factory = binning.BinFactory(table.get_slot("flat"))
+    factory.add_fixed_count(binning.BinType.MASS, 7)
+    factory.execute()
+
+    tree = factory.produced_truth_table
+    assert list(tree.keys()) == [str(index) for index in range(7)]
+    assert {len(events) for events in tree.values()} == {714, 715}
+
+    # Every bin's values are above the last bin's
+    for lower, upper in zip(list(tree.values()), list(tree.values())[1:]):
+        assert bin_data["mass"][lower].max() <= bin_data["mass"][upper].min()
+
+
+def test_fixed_count_inside_width_bins(table, bin_data):
+    factory = binning.BinFactory(table.get_slot("flat"))
+    factory.add_fixed_range(binning.BinType.MASS, 0, 2, 4)
+    factory.add_fixed_count(binning.BinType.T_PRIME, 3)
+    factory.execute()
+
+    tree = factory.produced_truth_table
+    masses = _expected(bin_data["mass"], 0, 2, 4)
+    for key, mass in masses.items():
+        events = npy.concatenate(list(tree[key].values()))
+        npy.testing.assert_array_equal(npy.sort(events), npy.flatnonzero(mass))
+
+        sizes = [len(events) for events in tree[key].values()]
+        assert max(sizes) - min(sizes) <= 1
+
+        t_primes = [bin_data["tp"][events] for events in tree[key].values()]
+        for lower, upper in zip(t_primes, t_primes[1:]):
+            assert lower.max() <= upper.min()
+
+
+def test_fixed_count_inside_fixed_count(table, bin_data):
+    factory = binning.BinFactory(table.get_slot("flat"))
+    factory.add_fixed_count(binning.BinType.MASS, 4)
+    factory.add_fixed_count(binning.BinType.T_PRIME, 5)
+    factory.execute()
+
+    tree = factory.produced_truth_table
+    for masses in tree.values():
+        assert {len(events) for events in masses.values()} == {250}
+        t_primes = [bin_data["tp"][events] for events in masses.values()]
+        for lower, upper in zip(t_primes, t_primes[1:]):
+            assert lower.max() <= upper.min()
+
+
+"""
+Test Bin Slot
+"""
+
+
+def test_bin_slot_copies_events(table, bin_data, tmp_path):
+    slot = table.get_slot("flat")
+    factory = binning.BinFactory(slot)
+    factory.add_fixed_range(binning.BinType.MASS, 0, 2, 3)
+    factory.execute()
+
+    binned = binning.BinSlot(slot)
+    table.set_custom_slot(binned)
+    binned.bin(factory.produced_truth_table)
+    table.close()
+
+    with tables.open_file(str(tmp_path / "binning.h5")) as stream:
+        for key, events in factory.produced_truth_table.items():
+            group = getattr(stream.root.bin_slot.flat, key)
+            npy.testing.assert_array_equal(group.root.read()["x"], events)
+            npy.testing.assert_array_equal(
+                group.bin_data.read(), bin_data[events]
+            )
+
+    with (tmp_path / "binning_bin_data.json").open() as stream:
+        metadata = json.load(stream)
+    assert sum(value["total"] for value in metadata.values()) == EVENTS
+
+
+@pytest.mark.parametrize("chunk_size", [EVENTS, 1234])
+def test_stream_bins_matches_bin(table, tmp_path, chunk_size):
+    slot = table.get_slot("flat")
+    slot.add_data("weights", npy.arange(EVENTS) * 2)
+    factory = binning.BinFactory(slot)
+    factory.add_fixed_range(binning.BinType.MASS, 0, 2, 3)
+    factory.add_fixed_count(binning.BinType.T_PRIME, 2)
+    factory.execute()
+
+    binned = binning.BinSlot(slot)
+    table.set_custom_slot(binned)
+    binned.stream_bins(factory, chunk_size)
+    tree = factory.produced_truth_table
+    table.close()
+
+    with (tmp_path / "binning_bin_data.json").open() as stream:
+        metadata = json.load(stream)
+
+    with tables.open_file(str(tmp_path / "binning.h5")) as stream:
+        for mass, t_primes in tree.items():
+            for tp, events in t_primes.items():
+                group = getattr(getattr(stream.root.bin_slot.flat, mass), tp)
+                npy.testing.assert_array_equal(group.root.read()["x"], events)
+                npy.testing.assert_array_equal(
+                    group.weights.read(), events * 2
+                )
+                assert metadata[mass][tp]["total"] == len(events)
+
+
+"""
+Test User Variables
+"""
+
+
+def test_user_variables_are_cached(table, monkeypatch):
+    monkeypatch.setattr(binning, "_EVENT_CHUNK", 1500)
+    slot = table.get_slot("flat")
+    calls = []
+
+    def double_x(chunk):
+        calls.append(len(chunk))
+        return chunk["x"] * 2
+
+    factory = binning.BinFactory(slot)
+    factory.add_variable("double_x", double_x)
+    assert calls == [1500, 1500, 1500, 500]
+
+    # Binning the same variable again reuses the column
+    factory = binning.BinFactory(slot)
+    factory.add_variable("double_x", double_x)
+    factory.add_fixed_range("double_x", 0, EVENTS * 2, 5)
+    factory.execute()
+    assert len(calls) == 4
+
+    tree = factory.produced_truth_table
+    assert [len(tree[str(index)]) for index in range(5)] == [EVENTS // 5] * 5
+
+    # A changed function calculates the column again
+    factory.add_variable("double_x", lambda chunk: chunk["x"] * 3)
+    bins = slot.get_data("bin_data").read()
+    npy.testing.assert_array_equal(bins["double_x"], npy.arange(EVENTS) * 3)
+    assert npy.isin(["mass", "beam", "t", "tp"], bins.dtype.names).all()
+
+
+def test_unknown_variables_raise(table):
+    factory = binning.BinFactory(table.get_slot("flat"))
+    with pytest.raises(ValueError):
+        factory.add_fixed_count("missing", 3)
+    with pytest.raises(ValueError):
+        factory.add_variable("mass", lambda chunk: chunk["x"])
+
+
+def test_failed_user_variables_are_removed(table):
+    slot = table.get_slot("flat")
+    factory = binning.BinFactory(slot)
+
+    def failing(chunk):
+        raise ZeroDivisionError
+
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            factory.add_variable("failing", failing)
+    assert slot.extra_data == ["bin_data"]
+
+    factory.add_variable("x", lambda chunk: chunk["x"])
+    assert "x" in slot.get_data("bin_data").colnames
+
+
+def _scale_x(chunk, factor):
+    return chunk["x"] * factor
+
+
+def test_user_variables_without_source(table):
+    slot = table.get_slot("flat")
+    factory = binning.BinFactory(slot)
+    factory.add_variable("scaled", functools.partial(_scale_x, factor=2))
+    npy.testing.assert_array_equal(
+        slot.get_data("bin_data").read()["scaled"], npy.arange(EVENTS) * 2
+    )
+
+    # Partials differ by their arguments, ufuncs by their name
+    assert binning._get_source_hash(functools.partial(_scale_x, factor=2)) \
+        != binning._get_source_hash(functools.partial(_scale_x, factor=3))
+    assert binning._get_source_hash(npy.sqrt) \
+        != binning._get_source_hash(npy.exp)
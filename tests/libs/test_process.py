@@ -20,6 +20,7 @@ import numpy as npy
 import pytest
 
 from PyPWA.libs import process
+from PyPWA.libs.math import vectors
 
 TEST_DATA = {"data": npy.random.rand(100)}
 
@@ -162,3 +163,256 @@ def test_process_error_handling(get_duplex_state):
     )
     values = interface.run()
     assert process.ProcessCodes.ERROR in values
+
+
+"""
+Test Shared Memory
+"""
+
+
+class ParticleKernel(process.Kernel):
+
+    def __init__(self):
+        self.data: vectors.ParticlePool = None
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return sum(npy.sum(p.e) for p in self.data.iter_particles())
+
+
+@pytest.fixture(params=[True, False])
+def shared_interface(request):
+    interface = process.make_processes(
+        TEST_DATA, SimplexKernel(), SimplexInterface(), 3, False, True
+    )
+    yield interface
+    interface.stop(request.param)
+
+
+def test_shared_memory_sum_matches_expected(shared_interface):
+    npy.testing.assert_approx_equal(
+        shared_interface.run(), npy.sum(TEST_DATA['data'])
+    )
+
+
+def test_shared_memory_duplex_matches_expected():
+    interface = process.make_processes(
+        TEST_DATA, DuplexKernel(), DuplexInterface(), 3, True, True
+    )
+    final_value = interface.run("go")
+    interface.stop()
+    npy.testing.assert_approx_equal(final_value, npy.sum(TEST_DATA['data']))
+
+
+def test_shared_memory_particle_pool(random_particle_pool):
+    interface = process.make_processes(
+        {"data": random_particle_pool}, ParticleKernel(),
+        SimplexInterface(), 3, False, True
+    )
+    final_value = interface.run()
+    interface.stop()
+
+    expected = sum(npy.sum(p.e) for p in random_particle_pool.iter_particles())
+    npy.testing.assert_approx_equal(final_value, expected)
+
+
+"""
+Test Process Pool
+"""
+
+
+class ScaledKernel(process.Kernel):
+
+    def __init__(self, scale: float = 1):
+        self.data: npy.ndarray = None
+        self.scale = scale
+
+    def setup(self):
+        pass
+
+    def process(self, data=1):
+        return self.scale * data * npy.sum(self.data)
+
+
+@pytest.fixture(params=[True, False])
+def process_pool(request):
+    pool = process.ProcessPool(3, request.param)
+    pool.load(ScaledKernel(), DuplexInterface(), TEST_DATA)
+    yield pool
+    pool.stop()
+
+
+def test_pool_can_run_repeatedly(process_pool):
+    expected = npy.sum(TEST_DATA['data'])
+    for multiplier in range(1, 4):
+        npy.testing.assert_approx_equal(
+            process_pool.run(multiplier), multiplier * expected
+        )
+
+
+def test_pool_keeps_data_when_kernel_swapped(process_pool):
+    process_pool.load(ScaledKernel(10), DuplexInterface())
+    npy.testing.assert_approx_equal(
+        process_pool.run(1), 10 * npy.sum(TEST_DATA['data'])
+    )
+
+
+def test_pool_map_and_submit(process_pool):
+    expected = npy.sum(TEST_DATA['data'])
+    future = process_pool.submit(5)
+    mapped = list(process_pool.map([1, 2, 3]))
+
+    npy.testing.assert_approx_equal(future.result(), 5 * expected)
+    npy.testing.assert_allclose(mapped, [expected, 2 * expected, 3 * expected])
+
+
+class SetupErrorKernel(ScaledKernel):
+
+    def setup(self):
+        raise RuntimeError("Testing Errors are caught in setup")
+
+
+def test_pool_raises_when_kernel_fails_setup(process_pool):
+    with pytest.raises(RuntimeError):
+        process_pool.load(SetupErrorKernel(), DuplexInterface())
+
+
+"""
+Test Batches
+"""
+
+
+class VectorizedKernel(ScaledKernel):
+
+    def process_batch(self, batch):
+        return npy.asarray(batch) * npy.sum(self.data)
+
+
+@pytest.fixture(params=[ScaledKernel, VectorizedKernel])
+def batch_interface(request):
+    interface = process.make_processes(
+        TEST_DATA, request.param(), DuplexInterface(), 3, True
+    )
+    yield interface
+    interface.stop()
+
+
+def test_batch_matches_individual_runs(batch_interface):
+    batch = [1, 2.5, 4]
+    expected = [batch_interface.run(value) for value in batch]
+    npy.testing.assert_allclose(batch_interface.run_batch(batch), expected)
+
+
+def test_batch_raises_on_kernel_error():
+    interface = process.make_processes(
+        TEST_DATA, KernelError(), DuplexInterface(), 3, True
+    )
+    with pytest.raises(RuntimeError):
+        interface.run_batch([1, 2])
+    interface.stop(True)
+
+
+def test_batch_raises_on_simplex(simplex_interface):
+    with pytest.raises(RuntimeError):
+        simplex_interface.run_batch([1, 2])
+
+
+def test_pool_batch(process_pool):
+    expected = npy.sum(TEST_DATA['data'])
+    npy.testing.assert_allclose(
+        process_pool.run_batch([1, 2]), [expected, 2 * expected]
+    )
+
+
+"""
+Test Chunked Scheduling
+"""
+
+
+class OrderedKernel(process.Kernel):
+
+    def __init__(self):
+        self.data: npy.ndarray = None
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return self.PROCESS_ID, self.data * (2 if data else 1)
+
+
+class OrderedInterface(process.Interface):
+
+    def __init__(self, is_duplex: bool):
+        self.__duplex = is_duplex
+
+    def run(self, connections, args):
+        if self.__duplex:
+            for connection in connections:
+                connection.send(args[0])
+
+        results = list(range(len(connections)))
+        for connection in connections:
+            index, value = connection.recv()
+            results[index] = value
+        return npy.concatenate(results)
+
+
+def test_chunked_simplex_stitches_in_order():
+    interface = process.make_processes(
+        TEST_DATA, OrderedKernel(), OrderedInterface(False), 3, False,
+        chunk_count=17
+    )
+    values = interface.run()
+    interface.stop()
+    npy.testing.assert_array_equal(values, TEST_DATA["data"])
+
+
+def test_chunked_duplex_runs_repeatedly():
+    interface = process.make_processes(
+        TEST_DATA, DuplexKernel(), DuplexInterface(), 3, chunk_count=10
+    )
+    for i in range(3):
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(TEST_DATA["data"])
+        )
+    assert None not in interface.chunk_times
+    assert len(interface.chunk_times) == 10
+
+    interface.stop()
+
+
+def test_chunked_particle_pool(random_particle_pool):
+    interface = process.make_processes(
+        {"data": random_particle_pool}, ParticleKernel(),
+        DuplexInterface(), 2, chunk_count=7
+    )
+    final_value = interface.run(True)
+    interface.stop()
+
+    expected = sum(npy.sum(p.e) for p in random_particle_pool.iter_particles())
+    npy.testing.assert_approx_equal(final_value, expected)
+
+
+def test_chunked_batch():
+    interface = process.make_processes(
+        TEST_DATA, ScaledKernel(), DuplexInterface(), 3, chunk_count=9
+    )
+    expected = npy.sum(TEST_DATA["data"])
+    npy.testing.assert_allclose(
+        interface.run_batch([1, 3]), [expected, 3 * expected]
+    )
+    interface.stop()
+
+
+def test_chunked_error_handling(get_duplex_state):
+    interface = process.make_processes(
+        TEST_DATA, KernelError(), get_duplex_state[0], 3,
+        get_duplex_state[1], chunk_count=12
+    )
+    values = interface.run()
+    interface.stop(True)
+    assert len(values) == 12
+    assert process.ProcessCodes.ERROR in values
@@ -0,0 +1,192 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as npy
+import pytest
+
+from PyPWA.libs import process, simulate
+from PyPWA.libs.file import slot_table
+
+INTENSITIES = npy.random.rand(10000)
+
+
+"""
+Test Rejection
+"""
+
+
+def test_same_seed_same_rejection():
+    first = simulate.make_rejection_list(INTENSITIES, seed=42)
+    second = simulate.make_rejection_list(INTENSITIES, seed=42)
+    npy.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 333, 10000, 50000])
+def test_chunks_match_single_pass(chunk_size):
+    single = simulate.make_rejection_list(INTENSITIES, seed=7)
+    chunked = simulate.make_rejection_list(
+        INTENSITIES, seed=7, chunk_size=chunk_size
+    )
+    npy.testing.assert_array_equal(single, chunked)
+
+
+def test_rejection_returns_normalized_weights():
+    rejection, weights = simulate.make_rejection_list(
+        INTENSITIES, seed=1, return_weights=True
+    )
+    npy.testing.assert_allclose(weights, INTENSITIES / INTENSITIES.max())
+    assert rejection.dtype == bool
+    assert len(rejection) == len(INTENSITIES)
+
+
+def test_max_intensity_always_passes():
+    rejection = simulate.make_rejection_list(npy.ones(100), seed=3)
+    assert rejection.all()
+
+
+def test_generators_are_independent():
+    first, second = simulate.get_generators(11, 2)
+    assert not npy.array_equal(first.random(10), second.random(10))
+
+
+def test_generators_are_reproducible():
+    first = simulate.get_generators(11, 2)[1].random(10)
+    second = simulate.get_generators(11, 2)[1].random(10)
+    npy.testing.assert_array_equal(first, second)
+
+
+"""
+Test Intensities
+"""
+
+
+def setup():
+    pass
+
+
+def intensity(data, parameters):
+    return data["x"] * parameters["A"] + data["y"]
+
+
+@pytest.fixture(scope="module")
+def flat_data():
+    data = npy.zeros(12345, [("x", "f8"), ("y", "f8")])
+    data["x"] = npy.random.rand(12345)
+    data["y"] = npy.random.rand(12345)
+    return data
+
+
+@pytest.fixture
+def table_slot(tmp_path, flat_data):
+    location = tmp_path / "simulate.h5"
+    writer = slot_table.SlotFactory(location, "w")
+    writer.add_slot("flat", list(flat_data.dtype.names))
+    writer.get_slot("flat").root_append(flat_data)
+    writer.close()
+
+    reader = slot_table.SlotFactory(location, "r")
+    yield reader.get_slot("flat")
+    reader.close()
+
+
+def test_pool_intensities_match_memory(flat_data):
+    from_memory = simulate.calculate_intensities(
+        intensity, setup, {"A": 2.5}, flat_data, 3, seed=5
+    )
+
+    pool = process.ProcessPool(3)
+    try:
+        from_pool = simulate.calculate_intensities(
+            intensity, setup, {"A": 2.5}, flat_data, pool=pool, seed=5
+        )
+        # The data already in the pool is reused
+        reused = [
+            simulate.calculate_intensities(
+                intensity, setup, {"A": a}, None, pool=pool, seed=5
+            ) for a in (2.5, 0.5)
+        ]
+    finally:
+        pool.stop()
+
+    npy.testing.assert_array_equal(from_pool, from_memory)
+    npy.testing.assert_array_equal(reused[0], from_memory)
+    npy.testing.assert_array_equal(
+        reused[1], simulate.calculate_intensities(
+            intensity, setup, {"A": 0.5}, flat_data, 3, seed=5
+        )
+    )
+
+
+def test_table_intensities_match_memory(table_slot, flat_data):
+    parameters = {"A": 2.5}
+    from_table = simulate.calculate_intensities(
+        intensity, setup, parameters, table_slot, 3, seed=5, chunk_size=1000
+    )
+    from_memory = simulate.calculate_intensities(
+        intensity, setup, parameters, flat_data, 3, seed=5
+    )
+    npy.testing.assert_array_equal(from_table, from_memory)
+
+
+@pytest.mark.filterwarnings("error")  # Catches the rejection file leaking
+def test_streaming_matches_memory(table_slot, flat_data, tmp_path):
+    parameters = {"A": 2.5}
+    streamed = simulate.calculate_intensities(
+        intensity, setup, parameters, table_slot, 3, seed=5,
+        chunk_size=1000, streaming=True, spill_directory=tmp_path
+    )
+    from_memory = simulate.calculate_intensities(
+        intensity, setup, parameters, flat_data, 3, seed=5
+    )
+    npy.testing.assert_array_equal(streamed, from_memory)
+    assert list(tmp_path.glob("*.npy")) == []
+
+
+def test_streaming_writable_table(tmp_path, flat_data):
+    writer = slot_table.SlotFactory(tmp_path / "writable.h5", "w")
+    writer.add_slot("flat", list(flat_data.dtype.names))
+    writer.get_slot("flat").root_append(flat_data)
+    writer.get_slot("flat").flush()
+
+    parameters = {"A": 2.5}
+    streamed = simulate.calculate_intensities(
+        intensity, setup, parameters, writer.get_slot("flat"),
+        seed=5, chunk_size=1000, streaming=True, spill_directory=tmp_path
+    )
+    writer.close()
+
+    from_memory = simulate.calculate_intensities(
+        intensity, setup, parameters, flat_data, 3, seed=5
+    )
+    npy.testing.assert_array_equal(streamed, from_memory)
+
+
+def x_intensity(data, parameters):
+    assert data.dtype.names == ("x",)
+    return data["x"] * parameters["A"]
+
+
+def test_only_columns_are_passed(table_slot, flat_data):
+    parameters = {"A": 2.5}
+    expected = simulate.make_rejection_list(flat_data["x"] * 2.5, seed=5)
+    for data in (table_slot, flat_data):
+        selected = simulate.calculate_intensities(
+            x_intensity, setup, parameters, data, 2, seed=5,
+            chunk_size=1000, columns=["x"]
+        )
+        npy.testing.assert_array_equal(selected, expected)
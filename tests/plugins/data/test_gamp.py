@@ -0,0 +1,88 @@
+import numpy as npy
+import pytest
+
+from PyPWA.plugins.data import gamp
+
+
+@pytest.fixture
+def gamp_file(tmp_path, random_particle_pool):
+    location = tmp_path / "data.gamp"
+    gamp.metadata.get_memory_parser().write(location, random_particle_pool)
+    return location
+
+
+def test_parse_matches_reader(gamp_file):
+    parsed = gamp.metadata.get_memory_parser().parse(gamp_file)
+
+    with gamp.metadata.get_reader(gamp_file) as reader:
+        for index, event in enumerate(reader):
+            for particle, expected in zip(
+                    parsed.iter_particles(), event.iter_particles()):
+                assert particle.id == expected.id
+                npy.testing.assert_array_equal(
+                    particle.get_array()[index], expected.get_array()[0]
+                )
+
+
+def test_parse_across_blocks(gamp_file, monkeypatch, random_particle_pool):
+    monkeypatch.setattr(gamp, "_BLOCK_SIZE", 1000)
+    parsed = gamp.metadata.get_memory_parser().parse(gamp_file)
+
+    for particle, expected in zip(
+            parsed.iter_particles(), random_particle_pool.iter_particles()):
+        npy.testing.assert_allclose(particle.get_array()["x"], expected.x)
+        npy.testing.assert_allclose(particle.get_array()["e"], expected.e)
+
+
+def test_parse_rejects_changing_particle_count(tmp_path):
+    location = tmp_path / "bad.gamp"
+    location.write_text(
+        "1\n1 0 0.1 0.2 0.3 0.4\n"
+        "2\n1 0 0.1 0.2 0.3 0.4\n1 0 0.1 0.2 0.3 0.4\n"
+    )
+    with pytest.raises(ValueError):
+        gamp.metadata.get_memory_parser().parse(location)
+
+
+def test_chunks_match_parse(gamp_file):
+    parsed = gamp.metadata.get_memory_parser().parse(gamp_file)
+    with gamp.metadata.get_reader(gamp_file) as reader:
+        chunks = list(reader.iter_chunks(200))
+
+    assert [chunk.event_count for chunk in chunks] == [200, 200, 100]
+    for index, particle in enumerate(parsed.iter_particles()):
+        npy.testing.assert_array_equal(
+            npy.concatenate([c.stored[index].get_array() for c in chunks]),
+            particle.get_array()
+        )
+
+
+def test_chunk_writes_match_event_writes(tmp_path, random_particle_pool):
+    by_event, by_chunk = tmp_path / "event.gamp", tmp_path / "chunk.gamp"
+
+    with gamp.metadata.get_writer(by_event) as writer:
+        for event in random_particle_pool.iter_events():
+            writer.write(event)
+
+    with gamp.metadata.get_writer(by_chunk) as writer:
+        writer.write_chunk(random_particle_pool)
+
+    assert by_event.read_text() == by_chunk.read_text()
+
+
+def test_parse_with_precision(gamp_file, random_particle_pool):
+    parsed = gamp.metadata.get_memory_parser().parse_columns(
+        gamp_file, None, npy.float32
+    )
+
+    for particle, expected in zip(
+            parsed.iter_particles(), random_particle_pool.iter_particles()):
+        assert particle.get_array().dtype["x"] == npy.float32
+        npy.testing.assert_allclose(
+            particle.get_array()["e"], expected.e, rtol=1e-6
+        )
+
+
+def test_parse_columns_is_unsupported(gamp_file):
+    with pytest.raises(ValueError):
+        gamp.metadata.get_memory_parser().parse_columns(gamp_file, ["x"])
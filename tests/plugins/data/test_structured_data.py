@@ -186,6 +186,52 @@ def test_tsv_matches_csv(sv_data_sets):
     )
 
 
+def test_sv_parse_selected_columns(sv_data_sets):
+    full = sv.parse(sv_data_sets[0])
+    selected = sv.parse(sv_data_sets[1], ["qf", "x"])
+
+    assert selected.dtype.names == ("qf", "x")
+    npy.testing.assert_array_equal(selected["qf"], full["qf"])
+    npy.testing.assert_array_equal(selected["x"], full["x"])
+
+
+def test_sv_parse_unknown_column():
+    with pytest.raises(ValueError):
+        sv.parse(ROOT / "set1.csv", ["not_a_column"])
+
+
+@pytest.mark.parametrize("processes", [2, 3, 50])
+def test_sv_parse_in_parallel(sv_data_sets, processes, monkeypatch):
+    monkeypatch.setattr(sv, "_BLOCK_SIZE", 1000)
+    npy.testing.assert_array_equal(
+        sv.parse(sv_data_sets[0], processes=processes),
+        sv.parse(sv_data_sets[0])
+    )
+
+
+def test_sv_parse_matches_reader(sv_data_sets):
+    with sv.metadata.get_reader(sv_data_sets[0]) as reader:
+        expected = npy.concatenate([npy.copy(event) for event in reader])
+    npy.testing.assert_array_equal(sv.parse(sv_data_sets[0]), expected)
+
+
+@pytest.mark.parametrize("delimiter", [",", "\t"])
+def test_sv_parse_quoted_values(tmp_path, delimiter):
+    location = tmp_path / "quoted.csv"
+    location.write_text(
+        delimiter.join(['"x"', '"y"']) + "\n" +
+        delimiter.join(['"1"', '"2"']) + "\n" +
+        delimiter.join(['"3.5"', '-4e3']) + "\n"
+    )
+    with sv.metadata.get_reader(location) as reader:
+        expected = npy.concatenate([npy.copy(event) for event in reader])
+
+    parsed = sv.parse(location)
+    assert parsed.dtype.names == ("x", "y")
+    npy.testing.assert_array_equal(parsed, expected)
+    npy.testing.assert_array_equal(parsed["y"], [2, -4000])
+
+
 """
 Numpy Specific Tests
 """
@@ -226,3 +272,195 @@ def test_numpy_reader_and_writer(numpy_flat):
             npy.testing.assert_array_equal(data[index], event)
 
     npy_file.unlink()
+
+
+def test_numpy_memory_map():
+    data = numpy.metadata.get_memory_parser().memory_map(
+        ROOT / "set1.npy", "r"
+    )
+    assert isinstance(data, npy.memmap)
+    npy.testing.assert_array_equal(
+        data, numpy.metadata.get_memory_parser().parse(ROOT / "set1.npy")
+    )
+
+
+def test_processor_memory_maps_numpy():
+    from PyPWA.libs.file import processor
+    data = processor.DataProcessor().parse(ROOT / "set2.npy", mmap_mode="r")
+    assert isinstance(data, npy.memmap)
+    assert len(data) == 12
+
+
+def test_processor_memory_map_selects_columns():
+    from PyPWA.libs.file import processor
+    full = processor.DataProcessor().parse(ROOT / "set2.npy")
+    selected = processor.DataProcessor().parse(
+        ROOT / "set2.npy", mmap_mode="r", columns=["y", "m"]
+    )
+    assert selected.dtype == npy.dtype([("y", "f8"), ("m", "f8")])
+    npy.testing.assert_array_equal(selected["m"], full["m"])
+
+    with pytest.raises(ValueError):
+        processor.DataProcessor().parse(
+            ROOT / "set2.npy", mmap_mode="r", columns=["missing"]
+        )
+
+
+"""
+Test Chunked Readers
+"""
+
+
+@pytest.mark.parametrize("plugin, location", [
+    (sv, ROOT / "set1.csv"),
+    (sv, ROOT / "set1.tsv"),
+    (kv, ROOT / "set1.kvars"),
+    (numpy, ROOT / "set1.npy")
+])
+def test_chunks_match_parse(plugin, location):
+    expected = plugin.metadata.get_memory_parser().parse(location)
+    with plugin.metadata.get_reader(location) as reader:
+        chunks = list(reader.iter_chunks(300))
+
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    npy.testing.assert_array_equal(npy.concatenate(chunks), expected)
+
+
+def test_evil_chunks_with_reordered_columns(tmp_path):
+    location = tmp_path / "reordered.txt"
+    location.write_text("a=1,b=2\nb=3,a=4\n")
+    with kv.metadata.get_reader(location) as reader:
+        chunk = reader.read_chunk(2)
+
+    npy.testing.assert_array_equal(chunk["a"], [1, 4])
+    npy.testing.assert_array_equal(chunk["b"], [2, 3])
+
+
+def test_evil_chunks_with_missing_columns_fail(tmp_path):
+    location = tmp_path / "missing.txt"
+    location.write_text("a=1,b=2\na=3,a=4\n")
+    with kv.metadata.get_reader(location) as reader:
+        with pytest.raises(ValueError):
+            reader.read_chunk(2)
+
+
+"""
+Test Chunked Writers
+"""
+
+
+@pytest.mark.parametrize("plugin, extension", [
+    (sv, ".csv"), (sv, ".tsv"), (kv, ".kvars")
+])
+def test_chunk_writes_match_event_writes(
+        tmp_path, plugin, extension, numpy_flat):
+    by_event = tmp_path / ("event" + extension)
+    by_chunk = tmp_path / ("chunk" + extension)
+
+    with plugin.metadata.get_writer(by_event) as writer:
+        for index in range(len(numpy_flat)):
+            writer.write(numpy_flat[index:index + 1])
+
+    with plugin.metadata.get_writer(by_chunk) as writer:
+        writer.write_chunk(numpy_flat[:10])
+        writer.write_chunk(numpy_flat[10:])
+
+    assert by_event.read_text() == by_chunk.read_text()
+    npy.testing.assert_array_equal(
+        plugin.metadata.get_memory_parser().parse(by_chunk), numpy_flat
+    )
+
+
+@pytest.mark.parametrize("extension", [".csv", ".tsv"])
+def test_sv_writes_columns_in_their_own_type(tmp_path, extension):
+    data = npy.zeros(3, [("x", "f4"), ("n", "i8"), ("b", "?")])
+    data["x"] = [0.1, 2.5, -1e-7]
+    data["n"] = [3, -4, 2 ** 40]
+    data["b"] = [True, False, True]
+
+    by_event = tmp_path / ("event" + extension)
+    by_chunk = tmp_path / ("chunk" + extension)
+    with sv.metadata.get_writer(by_event) as writer:
+        for index in range(len(data)):
+            writer.write(data[index:index + 1])
+    with sv.metadata.get_writer(by_chunk) as writer:
+        writer.write_chunk(data)
+
+    delimiter = "," if extension == ".csv" else "\t"
+    expected = [delimiter.join(["x", "n", "b"])] + [
+        delimiter.join(repr(value) for value in row) for row in data
+    ]
+    assert by_chunk.read_text().splitlines() == expected
+    assert by_event.read_text() == by_chunk.read_text()
+    assert expected[1] == delimiter.join(["0.1", "3", "True"])
+
+
+def test_numpy_writer_appends_chunks(tmp_path, numpy_flat):
+    npy_file = tmp_path / "chunks.npy"
+    with numpy.metadata.get_writer(npy_file) as writer:
+        writer.write_chunk(numpy_flat[:10])
+        writer.write(numpy_flat[10])
+        writer.write_chunk(numpy_flat[11:])
+
+    npy.testing.assert_array_equal(npy.load(str(npy_file)), numpy_flat)
+
+
+def test_numpy_writer_without_events(tmp_path):
+    npy_file = tmp_path / "empty.npy"
+    numpy.metadata.get_writer(npy_file).close()
+    assert len(npy.load(str(npy_file))) == 0
+
+
+"""
+Test Column Selection
+"""
+
+
+@pytest.mark.parametrize("location", [
+    ROOT / "set1.csv", ROOT / "set1.kvars", ROOT / "set1.npy"
+])
+def test_processor_parses_columns(location):
+    from PyPWA.libs.file import processor
+    full = processor.DataProcessor().parse(location)
+    selected = processor.DataProcessor().parse(location, columns=["y", "m"])
+
+    assert selected.dtype.names == ("y", "m")
+    npy.testing.assert_array_equal(selected["y"], full["y"])
+    npy.testing.assert_array_equal(selected["m"], full["m"])
+
+
+def test_processor_parses_evil_with_reordered_columns(tmp_path):
+    from PyPWA.libs.file import processor
+    location = tmp_path / "reordered.txt"
+    location.write_text("a=1,b=2\nb=3,a=4\n")
+
+    full = kv.metadata.get_memory_parser().parse(location)
+    selected = processor.DataProcessor().parse(location, columns=["b"])
+    npy.testing.assert_array_equal(full["a"], [1, 4])
+    npy.testing.assert_array_equal(full["b"], [2, 3])
+    npy.testing.assert_array_equal(selected["b"], [2, 3])
+
+
+"""
+Test Precision
+"""
+
+
+@pytest.mark.parametrize("location", [
+    ROOT / "set1.csv", ROOT / "set1.kvars", ROOT / "set1.npy"
+])
+def test_processor_parses_with_precision(location):
+    from PyPWA.libs.file import processor
+    full = processor.DataProcessor().parse(location)
+    single = processor.DataProcessor().parse(location, precision="float32")
+
+    assert single.dtype.names == full.dtype.names
+    for name in single.dtype.names:
+        assert single.dtype[name] == npy.float32
+        npy.testing.assert_allclose(single[name], full[name], rtol=1e-6)
+
+
+def test_numpy_parse_columns_with_precision():
+    parser = numpy.metadata.get_memory_parser()
+    single = parser.parse_columns(ROOT / "set1.npy", ["x"], npy.float32)
+    assert single.dtype == npy.dtype([("x", "f4")])
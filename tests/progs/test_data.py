@@ -0,0 +1,72 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pathlib import Path
+
+import numpy as npy
+import pytest
+
+from PyPWA.libs.file import slot_table
+from PyPWA.progs import data
+
+ROOT = (Path(__file__).parent / "../test_data/docs").resolve()
+
+
+@pytest.fixture
+def table(tmp_path):
+    table = slot_table.SlotFactory(tmp_path / "table.h5", "w")
+    yield table
+    table.close()
+
+
+@pytest.mark.parametrize("processes", [2, 3])
+def test_data_appends_primaries_in_order(table, monkeypatch, processes):
+    monkeypatch.setattr(data, "_CHUNK_SIZE", 100)
+    primaries = [
+        ROOT / "set1.csv", ROOT / "set2.csv", ROOT / "set1.tsv",
+        ROOT / "set2.tsv"
+    ]
+    data._process_primary_data(table, "single", primaries)
+    data._process_primary_data(
+        table, "parallel", primaries, processes=processes
+    )
+
+    single = table.get_slot("single").get_root().read()
+    parallel = table.get_slot("parallel").get_root().read()
+    assert len(single) == 1000 + 12 + 1000 + 12
+    npy.testing.assert_array_equal(single, parallel)
+
+
+def test_data_raises_reader_errors(table, tmp_path):
+    broken = tmp_path / "broken.csv"
+    broken.write_text((ROOT / "set2.csv").read_text() + "1,2,3,4,five\n")
+
+    with pytest.raises(ValueError):
+        data._process_primary_data(
+            table, "broken", [ROOT / "set2.csv", broken], processes=2
+        )
+
+
+def test_data_rejects_mixed_primaries(table, tmp_path):
+    other = tmp_path / "other.csv"
+    other.write_text("a,b\n1,2\n")
+
+    with pytest.raises(ValueError):
+        data._process_primary_data(
+            table, "mixed", [ROOT / "set1.csv", other]
+        )